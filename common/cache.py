@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import codecs
+import hashlib
+import tempfile
+from time import time
+
+# katalog i maksymalny rozmiar pamięci podręcznej (można zmienić zmiennymi środowiskowymi)
+CACHE_DIR = os.environ.get('KRYPTOLOGIA_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'kryptologia'))
+MAX_SIZE = int(os.environ.get('KRYPTOLOGIA_CACHE_SIZE', 1 << 30))
+
+# wersja czyszczenia tekstu (common.normalize) - zmiana unieważnia zapisane wpisy
+NORMALIZE_VERSION = 1
+
+def cache_key(content, options):
+    """
+    Computes cache key of content cleaned with given options. NORMALIZE_VERSION
+    is hashed with the options, so entries made by older cleaning are not used.
+    Parameters:
+        content (bytes) - raw file content
+        options (dict) - normalization options (JSON serializable)
+    Returns:
+        key (string)
+    Raises:
+        TypeError: content is not bytes or options is not a dict
+    """
+    if type(content) != bytes or type(options) != dict:
+        raise TypeError
+
+    h = hashlib.sha256(content)
+    h.update(json.dumps(dict(options, normalize_version=NORMALIZE_VERSION), sort_keys=True).encode('utf8'))
+
+    return h.hexdigest()
+
+def entry_path(key, cache_dir=None):
+    """
+    Returns name of a file storing cache entry.
+    Parameters:
+        key (string) - cache key
+        cache_dir (string) - cache directory (default CACHE_DIR)
+    Returns:
+        file name (string)
+    """
+    return os.path.join(cache_dir or CACHE_DIR, key + '.txt')
+
+def get(key, cache_dir=None):
+    """
+    Reads cached text. Entry is marked as recently used.
+    Parameters:
+        key (string) - cache key
+        cache_dir (string) - cache directory (default CACHE_DIR)
+    Returns:
+        cleaned text (string) or None if there is no such entry
+    """
+    path = entry_path(key, cache_dir)
+    try:
+        with open(path, 'r', encoding='utf8', newline='') as f:
+            text = f.read()
+        os.utime(path)
+    except OSError:
+        return None
+
+    return text
+
+def put(key, text, cache_dir=None, max_size=None):
+    """
+    Saves cleaned text in cache and evicts least recently used entries
+    if cache gets bigger than max_size. Entry is written to a temporary
+    file of its own and renamed, so concurrent writers of the same key
+    never expose a partially written entry. Failure of the rename (e.g.
+    entry in use on Windows) is not an error, the entry is just not saved.
+    Parameters:
+        key (string) - cache key
+        text (string) - cleaned text
+        cache_dir (string) - cache directory (default CACHE_DIR)
+        max_size (int) - maximum cache size in bytes (default MAX_SIZE)
+    Returns:
+        if the entry was saved (bool)
+    Raises:
+        TypeError: text is not a string
+    """
+    if type(text) != str:
+        raise TypeError
+
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix='.tmp', prefix=key + '.', dir=cache_dir)
+    try:
+        with open(fd, 'w', encoding='utf8', newline='') as f:
+            f.write(text)
+        os.replace(tmp, entry_path(key, cache_dir))
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+    evict(cache_dir, max_size)
+    return True
+
+def entries(cache_dir=None):
+    """
+    Lists cache entries.
+    Parameters:
+        cache_dir (string) - cache directory (default CACHE_DIR)
+    Returns:
+        list of (key, size in bytes, time of last use) tuples,
+        least recently used first
+    """
+    try:
+        files = list(os.scandir(cache_dir or CACHE_DIR))
+    except OSError:
+        return []
+
+    result = []
+    for f in files:
+        if f.is_file() and f.name.endswith('.txt'):
+            st = f.stat()
+            result.append((f.name[:-4], st.st_size, st.st_mtime))
+
+    return sorted(result, key=lambda e: e[2])
+
+def evict(cache_dir=None, max_size=None):
+    """
+    Removes least recently used entries until cache fits in max_size.
+    Parameters:
+        cache_dir (string) - cache directory (default CACHE_DIR)
+        max_size (int) - maximum cache size in bytes (default MAX_SIZE)
+    Returns:
+        number of removed entries (int)
+    """
+    max_size = MAX_SIZE if max_size is None else max_size
+    cached = entries(cache_dir)
+    total = sum(size for _, size, _ in cached)
+    removed = 0
+    for key, size, _ in cached:
+        if total <= max_size:
+            break
+        try:
+            os.remove(entry_path(key, cache_dir))
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+
+    return removed
+
+def purge(cache_dir=None):
+    """
+    Removes all cache entries.
+    Parameters:
+        cache_dir (string) - cache directory (default CACHE_DIR)
+    Returns:
+        number of removed entries (int)
+    """
+    return evict(cache_dir, -1)
+
+def cached_clean(filename, options, clean, cache_dir=None, max_size=None):
+    """
+    Returns cleaned content of a file. File is cleaned only if the same
+    content with the same options is not in cache yet.
+    Parameters:
+        filename (string) - name of a file
+        options (dict) - normalization options, 'encoding' is used to decode file
+        clean (function) - cleaning function, takes and returns a string
+        cache_dir (string) - cache directory (default CACHE_DIR)
+        max_size (int) - maximum cache size in bytes (default MAX_SIZE)
+    Returns:
+        cleaned text (string)
+    Raises:
+        TypeError: filename is not a string
+    """
+    if type(filename) != str:
+        raise TypeError
+
+    with open(filename, 'rb') as f:
+        content = f.read()
+
+    options = dict(options, encoding=codecs.lookup(options.get('encoding', 'utf8')).name)
+    key = cache_key(content, options)
+    text = get(key, cache_dir)
+    if text is None:
+        text = clean(content.decode(options['encoding']))
+        put(key, text, cache_dir, max_size)
+
+    return text
+
+if __name__ == '__main__':
+    cache_dir = None
+    max_size = None
+    action = None
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] in ('-d', '--dir') and i + 1 < len(sys.argv):
+            cache_dir = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--max_size' and i + 1 < len(sys.argv):
+            max_size = int(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] in ('--list', '--purge', '--evict'):
+            action = sys.argv[i]
+        i += 1
+
+    if action is None:
+        print('Użycie:')
+        print('./cache.py --list|--purge|--evict [--dir <katalog>] [--max_size <bajty>]')
+        sys.exit()
+
+    if action == '--list':
+        cached = entries(cache_dir)
+        now = time()
+        for key, size, used in cached:
+            print(f'{key}  {size:>12} B  użyty {now - used:10.0f} s temu')
+        print(f'Katalog: {cache_dir or CACHE_DIR}')
+        print(f'Wpisów: {len(cached)}, rozmiar: {sum(e[1] for e in cached)} B (limit {MAX_SIZE if max_size is None else max_size} B)')
+    elif action == '--purge':
+        print(f'Usunięto wpisów: {purge(cache_dir)}')
+    else:
+        print(f'Usunięto wpisów: {evict(cache_dir, max_size)}')
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+
+from common.lazy import lazy_import
+
+# numpy potrzebne tylko przy generowaniu wielu kluczy naraz
+np = lazy_import('numpy')
+
+A = ord('a')
+
+# liczba kluczy generowanych i zapisywanych naraz
+BATCH = 1 << 16
+
+# największa długość klucza w formacie binarnym (długość zapisana na 2 bajtach)
+MAX_BINARY_LENGTH = (1 << 16) - 1
+
+def random_below(count, bound):
+    """
+    Draws uniformly distributed integers from 0 to bound - 1 using
+    os.urandom. Random bytes are read in bulk and values that would make
+    the result biased (above the largest multiple of bound) are rejected
+    with a vectorized mask.
+    Parameters:
+        count (int) - number of integers
+        bound (int) - upper bound (exclusive), at most 2**32
+    Returns:
+        integers (numpy.ndarray)
+    Raises:
+        ValueError: count is negative or bound is not in 1 - 2**32
+    """
+    if count < 0 or not 0 < bound <= 1 << 32:
+        raise ValueError
+
+    dtype = np.dtype(np.uint8 if bound <= 1 << 8 else np.uint16 if bound <= 1 << 16 else np.uint32)
+    span = 1 << 8*dtype.itemsize
+    limit = span - span%bound
+
+    result = np.empty(count, dtype)
+    filled = 0
+    while filled < count:
+        need = count - filled
+        # z zapasem na odrzucone wartości (odrzucanych jest mniej niż połowa)
+        raw = np.frombuffer(os.urandom((need + need//2 + 16)*dtype.itemsize), dtype)
+        if limit < span:
+            raw = raw[raw < limit]
+        raw = raw[:need]
+        result[filled:filled+len(raw)] = raw%bound
+        filled += len(raw)
+
+    return result
+
+def random_bytes_below(count, bound):
+    """
+    Draws uniformly distributed integers from 0 to bound - 1 using
+    os.urandom, without numpy (single keys are generated without paying
+    for its import). Bytes above the largest multiple of bound are rejected.
+    Parameters:
+        count (int) - number of integers
+        bound (int) - upper bound (exclusive), at most 256
+    Returns:
+        integers (list)
+    Raises:
+        ValueError: count is negative or bound is not in 1 - 256
+    """
+    if count < 0 or not 0 < bound <= 1 << 8:
+        raise ValueError
+
+    limit = 256 - 256%bound
+    result = []
+    while len(result) < count:
+        need = count - len(result)
+        result.extend(byte%bound for byte in os.urandom(need + need//2 + 16) if byte < limit)
+
+    return result[:count]
+
+def random_key(length):
+    """
+    Generates random cipher key (lowercase letters).
+    Parameters:
+        length (int) - key length
+    Returns:
+        key (string)
+    Raises:
+        TypeError: length is not a int
+        ValueError: length is not positive
+    """
+    if type(length) != int:
+        raise TypeError
+    if length <= 0:
+        raise ValueError
+
+    return bytes(A + letter for letter in random_bytes_below(length, 26)).decode('ascii')
+
+def random_permutations(count):
+    """
+    Generates random permutations of the alphabet with Fisher-Yates
+    shuffle done on all of them at once.
+    Parameters:
+        count (int) - number of permutations
+    Returns:
+        ASCII codes of permutations (numpy.ndarray of uint8, shape (count, 26))
+    """
+    perms = np.tile(np.arange(A, A + 26, dtype=np.uint8), (count, 1))
+    rows = np.arange(count)
+    for i in range(25, 0, -1):
+        j = random_below(count, i + 1)
+        perms[rows, i], perms[rows, j] = perms[rows, j], perms[rows, i]
+
+    return perms
+
+def random_permutation():
+    """
+    Generates random permutation of the alphabet (Fisher-Yates shuffle).
+    Returns:
+        permutation (string)
+    """
+    perm = list(range(A, A + 26))
+    for i in range(25, 0, -1):
+        j = random_bytes_below(1, i + 1)[0]
+        perm[i], perm[j] = perm[j], perm[i]
+
+    return bytes(perm).decode('ascii')
+
+def pack_keys(count, min_length, max_length=None, binary=False):
+    """
+    Generates random keys with lengths drawn from given range and packs them
+    into one buffer: one key per line or, in binary format, every key
+    preceded by its length (2 bytes, little-endian).
+    Parameters:
+        count (int) - number of keys
+        min_length (int) - shortest key length
+        max_length (int) - longest key length (default: min_length)
+        binary (bool) - if binary format is used
+    Returns:
+        packed keys (bytes)
+    """
+    if max_length is None:
+        max_length = min_length
+    lengths = min_length + random_below(count, max_length - min_length + 1).astype(np.int64)
+    letters = (random_below(int(lengths.sum()), 26) + A).astype(np.uint8)
+
+    # klucz zajmuje length bajtów i 1 (znak nowej linii) lub 2 (długość) bajty
+    extra = 2 if binary else 1
+    ends = np.cumsum(lengths + extra)
+    buf = np.empty(int(ends[-1]) if count else 0, np.uint8)
+    is_letter = np.ones(len(buf), bool)
+    if binary:
+        starts = ends - lengths - extra
+        buf[starts] = lengths & 0xff
+        buf[starts + 1] = lengths >> 8
+        is_letter[starts] = is_letter[starts + 1] = False
+    else:
+        buf[ends - 1] = ord('\n')
+        is_letter[ends - 1] = False
+    buf[is_letter] = letters
+
+    return buf.tobytes()
+
+def write_keys(output_file, count, min_length, max_length=None, binary=False, batch=BATCH):
+    """
+    Generates random keys and writes them to file in batches
+    (see pack_keys for the formats).
+    Parameters:
+        output_file (string) - name of a file
+        count (int) - number of keys
+        min_length (int) - shortest key length
+        max_length (int) - longest key length (default: min_length)
+        binary (bool) - if binary format is used
+        batch (int) - number of keys generated at once
+    Raises:
+        TypeError: output_file is not a string or count/lengths are not ints
+        ValueError: count is negative, lengths are not positive, range is empty,
+                    key is too long for binary format or batch is not positive
+    """
+    if max_length is None:
+        max_length = min_length
+    if type(output_file) != str or type(count) != int or type(min_length) != int or type(max_length) != int:
+        raise TypeError
+    if count < 0 or min_length <= 0 or max_length < min_length or batch <= 0:
+        raise ValueError
+    if binary and max_length > MAX_BINARY_LENGTH:
+        raise ValueError
+
+    with open(output_file, 'wb') as f:
+        for start in range(0, count, batch):
+            f.write(pack_keys(min(batch, count - start), min_length, max_length, binary))
+
+def write_permutations(output_file, count, binary=False, batch=BATCH):
+    """
+    Generates random permutations of the alphabet and writes them to file
+    in batches, one per line or, in binary format, 26 bytes each.
+    Parameters:
+        output_file (string) - name of a file
+        count (int) - number of permutations
+        binary (bool) - if binary format is used
+        batch (int) - number of permutations generated at once
+    Raises:
+        TypeError: output_file is not a string or count is not a int
+        ValueError: count is negative or batch is not positive
+    """
+    if type(output_file) != str or type(count) != int:
+        raise TypeError
+    if count < 0 or batch <= 0:
+        raise ValueError
+
+    with open(output_file, 'wb') as f:
+        for start in range(0, count, batch):
+            perms = random_permutations(min(batch, count - start))
+            if not binary:
+                perms = np.hstack((perms, np.full((len(perms), 1), ord('\n'), np.uint8)))
+            f.write(perms.tobytes())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import sys
+
+class LazyModule(object):
+    """
+    Stands for a module that is imported on first access to its attribute,
+    so importing a script does not pay for heavy dependencies of the
+    commands it does not run.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            __import__(self._name)
+            self._module = sys.modules[self._name]
+
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        return f'<lazy module {self._name!r}>'
+
+def lazy_import(name):
+    """
+    Returns module that is imported on first access to its attribute.
+    Module that is already imported is returned as it is. Errors of
+    the import (e.g. missing module) are raised on first access.
+    Parameters:
+        name (string) - absolute module name
+    Returns:
+        module or LazyModule
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    return LazyModule(name)
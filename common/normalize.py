@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import mmap
+
+from common.lazy import lazy_import
+
+# wczytywane dopiero przy pierwszym użyciu (szybki start skryptów)
+re = lazy_import('re')
+unidecode = lazy_import('unidecode')
+
+# rozmiar fragmentu (w bajtach) sprawdzanego i tłumaczonego przez clean_file
+CHUNK_SIZE = 1 << 20
+
+class CleanTable(dict):
+    """
+    Translation table for str.translate. Characters missing from the table
+    are removed from the text (and remembered, so each one is looked up once).
+    """
+    def __missing__(self, code):
+        self[code] = None
+        return None
+
+class TransliterationTable(dict):
+    """
+    Translation table for str.translate replacing every character with its
+    unidecode transliteration. Each code point is transliterated once and
+    remembered. Characters from delete are removed from transliterations.
+    """
+    def __init__(self, delete=''):
+        super().__init__()
+        self.delete = delete
+
+    def __missing__(self, code):
+        value = unidecode.unidecode(chr(code))
+        for c in self.delete:
+            value = value.replace(c, '')
+        self[code] = value if value else None
+        return self[code]
+
+# tablice zbudowane dla kolejnych zestawów opcji
+_clean_tables = {}
+_ascii_tables = {}
+_transliteration_tables = {}
+
+def transliteration_table(delete=''):
+    """
+    Returns (shared) transliteration table for given characters to delete.
+    Parameters:
+        delete (string) - characters removed from the result
+    Returns:
+        table for str.translate (TransliterationTable)
+    """
+    if delete not in _transliteration_tables:
+        _transliteration_tables[delete] = TransliterationTable(delete)
+
+    return _transliteration_tables[delete]
+
+def transliterate(text, delete=''):
+    """
+    Changes text to ASCII, same as unidecode, optionally removing some
+    characters from the result. Transliteration of every code point is
+    cached between calls.
+    Parameters:
+        text (string) - text to change
+        delete (string) - characters removed from the result
+    Returns:
+        ASCII text (string)
+    Raises:
+        TypeError: text is not a string
+    """
+    if type(text) != str:
+        raise TypeError
+
+    return text.translate(transliteration_table(delete))
+
+def clean_text(plaintext, keep_spaces=False):
+    """
+    Clears whitespace from file content.
+    Parameters:
+        plaintext (string) - file content
+        keep_spaces (bool) - if whitespace are kept
+    Returns:
+        prodessed plaintext (string)
+    Raises:
+        TypeError: plaintext is not a string
+    """
+    if type(plaintext) != str:
+        raise TypeError
+
+    if keep_spaces:
+        pattern = r'[^a-zA-Zą-źĄ-Ź0-9 ]+'
+    else:
+        pattern = r'[^a-zA-Zą-źĄ-Ź0-9]+'
+
+    return re.sub(pattern, '', plaintext)
+
+def clean_num(plaintext):
+    """
+    Clears numbers from file content
+    Parameters:
+        plaintext (string) - file content
+    Returns:
+        prodessed plaintext (string)
+    Raises:
+        TypeError: plaintext is not a string
+    """
+    if type(plaintext) != str:
+        raise TypeError
+
+    return re.sub(r'[0-9]+', '', plaintext)
+
+def clean_acc(plaintext, lower=True):
+    """
+    Changes uppercase letters to lowercase letters in file content.
+    Clears diacritics from file content.
+    Parameters:
+        plaintext (string) - file content
+        lower (bool) - if letters are changed to lowercase
+    Returns:
+        prodessed plaintext (string)
+    Raises:
+        TypeError: plaintext is not a string
+    """
+    if type(plaintext) != str:
+        raise TypeError
+
+    if lower:
+        plaintext = plaintext.lower()
+
+    return transliterate(plaintext)
+
+def clean_table(keep_spaces=False, remove_numbers=False, lower=False):
+    """
+    Returns translation table doing the work of clean_text, clean_num and
+    clean_acc in one pass. Table is built once for every set of options.
+    Parameters:
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+    Returns:
+        table for str.translate (CleanTable)
+    """
+    options = (keep_spaces, remove_numbers, lower)
+    if options not in _clean_tables:
+        table = CleanTable()
+        # clean_text przepuszcza tylko znaki z zakresu 0 - U+017A,
+        # pozostałe są usuwane przez CleanTable.__missing__
+        for code in range(0x180):
+            c = clean_text(chr(code), keep_spaces)
+            if remove_numbers:
+                c = clean_num(c)
+            c = clean_acc(c, lower)
+            table[code] = c if c else None
+        _clean_tables[options] = table
+
+    return _clean_tables[options]
+
+def ascii_clean_table(keep_spaces=False, remove_numbers=False, lower=False):
+    """
+    Returns bytes.translate arguments doing the work of normalize on pure
+    ASCII data. Built once for every set of options from clean_table.
+    Parameters:
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+    Returns:
+        translation table (bytes), bytes to delete (bytes)
+    """
+    options = (keep_spaces, remove_numbers, lower)
+    if options not in _ascii_tables:
+        table = clean_table(keep_spaces, remove_numbers, lower)
+        translation = bytearray(range(256))
+        delete = bytearray()
+        for code in range(128):
+            if table[code] is None:
+                delete.append(code)
+            else:
+                translation[code] = ord(table[code])
+        _ascii_tables[options] = bytes(translation), bytes(delete)
+
+    return _ascii_tables[options]
+
+# zmiana wyniku czyszczenia wymaga zwiększenia common.cache.NORMALIZE_VERSION
+def normalize(plaintext, keep_spaces=False, remove_numbers=False, lower=False):
+    """
+    Cleans text in a single pass. Gives the same result as clean_text,
+    clean_num (if remove_numbers) and clean_acc called one after another.
+    Parameters:
+        plaintext (string) - file content
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+    Returns:
+        cleaned text (string)
+    Raises:
+        TypeError: plaintext is not a string
+    """
+    if type(plaintext) != str:
+        raise TypeError
+
+    return plaintext.translate(clean_table(keep_spaces, remove_numbers, lower))
+
+def clean_file(filename, keep_spaces=False, remove_numbers=False, lower=False,
+               encoding='utf8', chunk_size=CHUNK_SIZE):
+    """
+    Opens file and cleans its content, same as reading it and calling
+    normalize. File is memory-mapped and while its content is pure ASCII,
+    it is filtered with bytes.translate without decoding. From the first
+    chunk containing non-ASCII bytes on, the Unicode path is used.
+    Parameters:
+        filename (string) - name of a file
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+        encoding (string) - file encoding (must be compatible with ASCII)
+        chunk_size (int) - number of bytes checked and translated at once
+    Returns:
+        cleaned file content (string)
+    Raises:
+        TypeError: filename is not a string
+        ValueError: chunk_size is not positive
+    """
+    if type(filename) != str:
+        raise TypeError
+    if chunk_size <= 0:
+        raise ValueError
+
+    translation, delete = ascii_clean_table(keep_spaces, remove_numbers, lower)
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ''
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            parts = []
+            pos = 0
+            while pos < size:
+                chunk = mm[pos:pos+chunk_size]
+                if not chunk.isascii():
+                    break
+                parts.append(chunk.translate(translation, delete))
+                pos += len(chunk)
+
+            plaintext = b''.join(parts).decode('ascii')
+            if pos < size:
+                plaintext += normalize(mm[pos:].decode(encoding), keep_spaces, remove_numbers, lower)
+
+    return plaintext
+
+def shard_ranges(filename, shards, utf8=True):
+    """
+    Splits file into byte ranges of similar size. If the file is encoded in
+    UTF-8, every range starts at the beginning of a character.
+    Parameters:
+        filename (string) - name of a file
+        shards (int) - number of ranges
+        utf8 (bool) - if the file is encoded in UTF-8 (False for single-byte encodings)
+    Returns:
+        list of (start, end) byte offsets, empty ranges are skipped
+    Raises:
+        TypeError: filename is not a string
+        ValueError: shards is not positive
+    """
+    if type(filename) != str:
+        raise TypeError
+    if shards <= 0:
+        raise ValueError
+
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, 'rb') as f:
+        for shard in range(1, shards):
+            start = max(size*shard//shards, bounds[-1])
+            f.seek(start)
+            # pominięcie bajtów kontynuacji znaku (postaci 10xxxxxx)
+            for byte in f.read(4) if utf8 else b'':
+                if byte & 0xC0 != 0x80:
+                    break
+                start += 1
+            bounds.append(min(start, size))
+    bounds.append(size)
+
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if start < end]
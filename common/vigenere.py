@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+A = ord('a')
+
+# (kod - ord('a')) % 26 dla każdego bajtu
+RESIDUES = ((np.arange(256) - A) % 26).astype(np.uint8)
+
+def residues(text):
+    """
+    Converts text to array of (code - ord('a')) % 26 values.
+    Parameters:
+        text (string) - text
+    Returns:
+        residues (numpy.ndarray of uint8)
+    """
+    if text.isascii():
+        codes = np.frombuffer(text.encode('ascii'), np.uint8)
+        # same małe litery (tekst po oczyszczeniu) - wystarczy odejmowanie
+        if len(codes) and codes.min() >= A and codes.max() < A + 26:
+            return codes - np.uint8(A)
+        return RESIDUES[codes]
+
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), np.uint32).astype(np.int64)
+    return ((codes - A) % 26).astype(np.uint8)
+
+def key_residues(key, sign, phase=0):
+    """
+    Converts key to residues added to the text, starting from given phase.
+    Parameters:
+        key (string) - cipher key
+        sign (int) - 1 to encrypt, -1 to decrypt
+        phase (int) - index of key letter used for the first character
+    Returns:
+        residues (numpy.ndarray of uint8)
+    Raises:
+        TypeError: key is not a string
+        ValueError: key is empty
+    """
+    if type(key) != str:
+        raise TypeError
+    if not key:
+        raise ValueError
+
+    key_res = np.roll(residues(key), -(phase%len(key)))
+    if sign < 0:
+        key_res = (26 - key_res) % 26
+
+    return key_res
+
+def tile(key_res, length):
+    """
+    Repeats key residues to cover text of given length.
+    Parameters:
+        key_res (numpy.ndarray of uint8) - key residues
+        length (int) - text length
+    Returns:
+        residues, at least length long (numpy.ndarray of uint8)
+    """
+    if len(key_res) >= length:
+        return key_res
+
+    return np.tile(key_res, -(-length//len(key_res)))
+
+def shift_residues(text_res, key_res):
+    """
+    Adds key to text residues and changes them to letter codes (in place).
+    Parameters:
+        text_res (numpy.ndarray of uint8) - text residues
+        key_res (numpy.ndarray of uint8) - key residues (see key_residues),
+                                           may be already tiled to the text length
+    Returns:
+        text_res with codes of shifted letters
+    """
+    # klucz powielony do długości tekstu
+    n = len(text_res)
+    text_res += tile(key_res, n)[:n]
+    # modulo 26 dla sum 0 - 50: dla sumy < 26 odejmowanie przepełnia się
+    # (uint8) i daje liczbę większą od sumy, więc minimum wybiera sumę
+    np.minimum(text_res, text_res - np.uint8(26), out=text_res)
+    text_res += np.uint8(A)
+
+    return text_res
+
+def shift_codes(codes, key_res, out=None):
+    """
+    Shifts ASCII codes of text by key residues.
+    Parameters:
+        codes (numpy.ndarray of uint8) - array of ASCII codes
+        key_res (numpy.ndarray of uint8) - key residues (see key_residues)
+        out (numpy.ndarray of uint8) - writable array of the same length
+                                       for the result (default: codes)
+    Returns:
+        out with codes of shifted letters
+    """
+    if out is None:
+        out = codes
+    if len(codes) == 0:
+        return out
+
+    if codes.min() >= A and codes.max() < A + 26:
+        np.subtract(codes, np.uint8(A), out=out)
+    else:
+        np.take(RESIDUES, codes, out=out)
+
+    return shift_residues(out, key_res)
+
+def shift_buffer(data, out, key_res):
+    """
+    Shifts bytes of ASCII text from one buffer to another (or the same)
+    without copying them.
+    Parameters:
+        data (bytes-like) - ASCII codes of text
+        out (writable bytes-like) - buffer of the same length for the result
+        key_res (numpy.ndarray of uint8) - key residues (see key_residues)
+    Returns:
+        out
+    """
+    shift_codes(np.frombuffer(data, np.uint8), key_res, np.frombuffer(out, np.uint8))
+
+    return out
+
+def shift(text, key, sign, phase=0):
+    """
+    Shifts every character of text by the matching key letter, the same way
+    as chr(((ord(p) - ord('a')) + sign*(ord(k) - ord('a')))%26 + ord('a')).
+    Parameters:
+        text (string) - text
+        key (string) - cipher key
+        sign (int) - 1 to encrypt, -1 to decrypt
+        phase (int) - index of key letter used for the first character
+    Returns:
+        shifted text (string)
+    Raises:
+        TypeError: text or key is not a string
+        ValueError: key is empty
+    """
+    if type(text) != str:
+        raise TypeError
+
+    key_res = key_residues(key, sign, phase)
+
+    return shift_residues(residues(text), key_res).tobytes().decode('ascii')
+
+def encrypt(plaintext, key, phase=0):
+    """
+    Encrypts plaintext using viganere algorithm.
+    Parameters:
+        plaintext (string) - text
+        key (string) - cipher key
+        phase (int) - index of key letter used for the first character
+    Returns:
+        ciphered text (string)
+    Raises:
+        TypeError: plaintext or key is not a string
+        ValueError: key is empty
+    """
+    return shift(plaintext, key, 1, phase)
+
+def decrypt(ciphertext, key, phase=0):
+    """
+    Decrypts ciphertext using viganere algorithm.
+    Parameters:
+        ciphertext (string) - text
+        key (string) - cipher key
+        phase (int) - index of key letter used for the first character
+    Returns:
+        decrypted text (string)
+    Raises:
+        TypeError: ciphertext or key is not a string
+        ValueError: key is empty
+    """
+    return shift(ciphertext, key, -1, phase)
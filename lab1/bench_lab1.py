@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import locale
+import tempfile
+
+import lab1
+
+def make_input(base, size, filename):
+    """
+    Creates test file of given size by repeating content of base file.
+    Parameters:
+        base (bytes) - content to repeat
+        size (int) - file size in bytes
+        filename (string) - name of a file
+    """
+    with open(filename, 'wb') as f:
+        left = size
+        while left > 0:
+            part = base[:left]
+            # nie przecinamy znaku UTF-8 na końcu pliku
+            if len(part) < len(base):
+                part = part[:len(part) - lab1.utf8_tail(part)]
+                if not part:
+                    break
+            f.write(part)
+            left -= len(part)
+
+def run_pipelines(input_file, output_file, keep_spaces, remove_numbers, lower):
+    """
+    Runs staged and fused lab1 pipelines on a file, measuring every stage.
+    Parameters:
+        input_file (string) - name of an input file
+        output_file (string) - name of an output file
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+    Returns:
+        list of measured stages (dicts), names prefixed with pipeline name
+    """
+    staged = lab1.StageReport()
+    plaintext = staged.measure('open_file', lab1.open_file, input_file, in_file=input_file)
+    plaintext = staged.measure('clean_text', lab1.clean_text, plaintext, keep_spaces)
+    if remove_numbers:
+        plaintext = staged.measure('clean_num', lab1.clean_num, plaintext)
+    plaintext = staged.measure('clean_acc', lab1.clean_acc, plaintext, lower)
+    plaintext = staged.measure('col_text', lab1.col_text, plaintext)
+    staged.measure('write_to_file', lab1.write_to_file, plaintext, output_file, out_file=output_file)
+
+    fused = lab1.StageReport()
+    plaintext = fused.measure('clean_file', lab1.clean_file, input_file, keep_spaces, remove_numbers, lower,
+                              locale.getpreferredencoding(False), in_file=input_file)
+    plaintext = fused.measure('col_text', lab1.col_text, plaintext)
+    fused.measure('write_to_file', lab1.write_to_file, plaintext, output_file, out_file=output_file)
+
+    stream = lab1.StageReport()
+    stream.measure('stream_file', lab1.stream_file, input_file, output_file, keep_spaces, remove_numbers, lower,
+                   in_file=input_file, out_file=output_file)
+
+    stages = []
+    for pipeline, report in (('staged', staged), ('fused', fused), ('stream', stream)):
+        for stage in report.as_dict()['stages']:
+            stages.append(dict(stage, stage=f'{pipeline}.{stage["stage"]}'))
+
+    return stages
+
+if __name__ == '__main__':
+    base_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'txts', 'rand1Mchars.txt')
+    sizes = [0.25, 1, 4, 16, 64]
+    json_file = None
+    keep_spaces = False
+    remove_numbers = False
+    lower = False
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '-f' and i + 1 < len(sys.argv):
+            base_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--sizes' and i + 1 < len(sys.argv):
+            sizes = [float(size) for size in sys.argv[i+1].split(',')]
+            i += 1
+        elif sys.argv[i] == '--json' and i + 1 < len(sys.argv):
+            json_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--remove_numbers':
+            remove_numbers = True
+        elif sys.argv[i] == '--lower':
+            lower = True
+        elif sys.argv[i] == '--keep_spaces':
+            keep_spaces = True
+        elif sys.argv[i] in ('-h', '--help'):
+            print('Użycie:')
+            print('./bench_lab1.py [-f <plik bazowy>] [--sizes <MB,MB,...>] [--json <plik wynikowy>]')
+            print('                [--remove_numbers] [--lower] [--keep_spaces]')
+            sys.exit()
+        i += 1
+
+    with open(base_file, 'rb') as f:
+        base = f.read()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'input.txt')
+        output_file = os.path.join(tmp, 'output.txt')
+        for size in sizes:
+            make_input(base, int(size*1e6), input_file)
+            print(f'Rozmiar {size} MB... ', end='', flush=True)
+            stages = run_pipelines(input_file, output_file, keep_spaces, remove_numbers, lower)
+            results.append({'size': os.path.getsize(input_file), 'stages': stages})
+            print('gotowe')
+
+    # tabela: przepustowość (MB/s) każdego etapu dla kolejnych rozmiarów
+    names = [stage['stage'] for stage in results[0]['stages']]
+    print()
+    print(f'{"etap [MB/s]":<24}' + ''.join(f'{result["size"]/1e6:>10.2f}' for result in results))
+    for name in names:
+        row = f'{name:<24}'
+        for result in results:
+            stage = next(stage for stage in result['stages'] if stage['stage'] == name)
+            row += '         -' if stage['mb_per_s'] is None else f'{stage["mb_per_s"]:>10.2f}'
+        print(row)
+
+    if json_file is not None:
+        with open(json_file, 'w') as f:
+            json.dump({'base_file': base_file, 'options': {'keep_spaces': keep_spaces,
+                       'remove_numbers': remove_numbers, 'lower': lower}, 'results': results}, f, indent=2)
@@ -1,6 +1,21 @@
-import re
+import os
 import sys
-import unidecode as ud
+import glob
+import json
+import codecs
+import locale
+import hashlib
+from multiprocessing import Pool
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common import cache
+from common.normalize import clean_text, clean_num, clean_acc, clean_table, normalize, clean_file, shard_ranges
+
+# rozmiar fragmentu (w znakach) czytanego w trybie strumieniowym
+CHUNK_SIZE = 1 << 20
+# docelowy rozmiar fragmentu (w bajtach) przetwarzanego przez jeden proces
+SHARD_SIZE = 16 << 20
 
 def open_file(filename):
     """
@@ -23,38 +38,6 @@ def open_file(filename):
     
     return content
 
-def clean_text(plaintext, keep_spaces=False):
-    if type(plaintext) != str:
-        raise TypeError
-
-    if keep_spaces:
-        pattern = r'[^a-zA-Zą-źĄ-Ź0-9 ]+'
-    else:
-        pattern = r'[^a-zA-Zą-źĄ-Ź0-9]+'
-
-    return re.sub(pattern, '', plaintext)
-
-def clean_num(plaintext):
-    if type(plaintext) != str:
-        raise TypeError
-
-    return re.sub(r'[0-9]+', '', plaintext)
-
-def clean_acc(plaintext, lower=True):
-    if type(plaintext) != str:
-        raise TypeError
-    '''
-    plaintext = plaintext.lower()
-    sub_arr = [['ą', 'a'], ['ć', 'c'], ['ę', 'e'], ['ł', 'l'], ['ń', 'n'], ['ó', 'o'], ['ś', 's'], ['ż', 'z'], ['ź', 'z']]
-    for p, s in sub_arr:
-        plaintext = re.sub(p, s, plaintext)
-    return plaintext
-    '''
-    if lower:
-        plaintext = plaintext.lower()
-
-    return ud.unidecode(plaintext)
-
 def col_text(plaintext):
     if type(plaintext) != str:
         raise TypeError
@@ -75,75 +58,810 @@ def write_to_file(plaintext, filename):
     with open(filename, 'w') as f:
         f.write(plaintext)
 
-input_file = ''
-output_file = ''
-remove_numbers = False
-lower = False
-keep_spaces = False
+def clean_chunks(chunks, keep_spaces=False, remove_numbers=False, lower=False):
+    """
+    Cleans every chunk of text with normalize. It works on single
+    characters, so chunk borders do not matter.
 
-i = 0
-while i < len(sys.argv):
-    if sys.argv[i] == '-f' and i + 1 < len(sys.argv):
-        input_file = sys.argv[i+1]
-        i += 1
-    if sys.argv[i] == '-o' and i + 1 < len(sys.argv):
-        output_file = sys.argv[i+1]
-        i += 1
-    if sys.argv[i] == '--remove_numbers':
-        remove_numbers = True
-    if sys.argv[i] == '--lower':
-        lower = True
-    if sys.argv[i] == '--keep_spaces':
-        keep_spaces = True
-    i += 1
-
-done = False
-while not done:
+    Parameters:
+        chunks (iterable of strings) - consecutive parts of the text
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+
+    Yields:
+        (string) cleaned chunk
+    """
+    for chunk in chunks:
+        yield normalize(chunk, keep_spaces, remove_numbers, lower)
+
+def col_text_stream(chunks, carry='', first_line=True):
+    """
+    Streaming version of col_text. Characters that do not fill a whole
+    35-character line are carried over to the next chunk, so the joined
+    output is the same as col_text of the joined input.
+
+    Parameters:
+        chunks (iterable of strings) - consecutive parts of the text
+        carry (string) - characters of an unfinished line written before
+        first_line (bool) - if nothing was written before
+
+    Yields:
+        (string) next part of the text in collumns
+    """
+    for chunk in chunks:
+        carry += chunk
+        full = len(carry) - len(carry)%35
+        if full:
+            lines = col_text(carry[:full])
+            yield lines if first_line else '\n' + lines
+            first_line = False
+            carry = carry[full:]
+    if carry:
+        lines = col_text(carry)
+        yield lines if first_line else '\n' + lines
+
+def stream_file(input_file, output_file, keep_spaces=False, remove_numbers=False, lower=False, chunk_size=CHUNK_SIZE):
+    """
+    Cleans file and puts it into collumns reading and writing it in chunks,
+    so memory usage does not depend on file size.
+
+    Parameters:
+        input_file (string) - name of an input file
+        output_file (string) - name of an output file
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+        chunk_size (int) - number of characters read at once
+
+    Raises:
+        TypeError: input_file/output_file is not a string
+        ValueError: chunk_size is not positive
+    """
+    if type(input_file) != str or type(output_file) != str:
+        raise TypeError
+    if chunk_size <= 0:
+        raise ValueError
+
+    with open(input_file, 'r') as fin, open(output_file, 'w') as fout:
+        chunks = iter(lambda: fin.read(chunk_size), '')
+        for part in col_text_stream(clean_chunks(chunks, keep_spaces, remove_numbers, lower)):
+            fout.write(part)
+
+def utf8_tail(data):
+    """
+    Counts bytes at the end of data which form an incomplete UTF-8 character.
+
+    Parameters:
+        data (bytes) - UTF-8 encoded text
+
+    Returns:
+        (int) number of bytes of the incomplete character (0 - 3)
+    """
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 != 0x80:
+            # bajt początkowy: 110xxxxx - 2 bajty, 1110xxxx - 3, 11110xxx - 4
+            length = 1 if byte < 0xC0 else 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return back if back < length else 0
+    return 0
+
+def split_encoding(encoding):
+    """
+    Checks if file in given encoding can be split into byte ranges decoded
+    separately: UTF-8 (ranges start at the beginning of a character, see
+    utf8_tail) or a single-byte encoding (e.g. cp1250, any byte offset).
+
+    Parameters:
+        encoding (string) - file encoding
+
+    Returns:
+        (bool) True for UTF-8, False for a single-byte encoding
+
+    Raises:
+        ValueError: encoding is neither UTF-8 nor single-byte
+    """
+    name = codecs.lookup(encoding).name
+    if name == 'utf-8':
+        return True
+
+    decoder = codecs.getincrementaldecoder(name)('replace')
+    if all(len(decoder.decode(bytes([byte]))) == 1 for byte in range(256)):
+        return False
+
+    raise ValueError(f'kodowanie {encoding} nie jest obsługiwane (tylko UTF-8 i jednobajtowe)')
+
+def load_checkpoint(output_file):
+    """
+    Reads checkpoint saved by incremental_file next to the output file.
+
+    Parameters:
+        output_file (string) - name of an output file
+
+    Returns:
+        (dict) checkpoint or None if it does not exist or is broken
+    """
     try:
-        print(f'Otwieranie pliku {input_file}... ', end='')
-        plaintext = open_file(input_file)
-        print('gotowe')
-
-        print('Usuwanie białych znaków... ', end='')
-        plaintext = clean_text(plaintext, keep_spaces)
-        print('gotowe')
-
-        if remove_numbers:
-            print('Usuwanie cyfr... ', end='')
-            plaintext = clean_num(plaintext)
-            print('gotowe')
-
-        print('Usuwanie znaków diakrytycznych... ', end='')
-        plaintext = clean_acc(plaintext, lower)
-        print('gotowe')
-
-        print('Przekształcanie na kolumny... ', end='')
-        plaintext = col_text(plaintext)
-        print('gotowe')
-
-        print(f'Zapis wyniku do pliku {output_file}... ', end='')
-        write_to_file(plaintext, output_file)
-        print('gotowe')
-
-        done = True
-    except:
-        print('Wystąpił błąd. Podaj opcje jeszcze raz. Wpisane "exit" powoduje wyjście z programu')
-        input_file = input('Plik wejściowy: ')
-        if 'exit' == input_file.lower():
-            sys.exit()
-        output_file = input('Plik wyjściowy: ')
-        if 'exit' == output_file.lower():
-            sys.exit()
-        remove_numbers = input('Usuwanie liczb [y/n]: ')
-        if 'exit' == remove_numbers.lower():
-            sys.exit()
-        lower = input('Małe litery [y/n]: ')
-        if 'exit' == lower.lower():
-            sys.exit()
-        keep_spaces = input('Zachowanie spacji [y/n]: ')
-        if 'exit' == keep_spaces.lower():
-            sys.exit()
-
-        remove_numbers = remove_numbers in 'yY'
-        lower = lower in 'yY'
-        keep_spaces = keep_spaces in 'yY'
\ No newline at end of file
+        with open(output_file + '.ckpt', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def output_state(output_file, tail_size=4096):
+    """
+    Describes output file for a checkpoint: its size and SHA-256 of its
+    last bytes, so an output overwritten by another run is detected.
+
+    Parameters:
+        output_file (string) - name of an output file
+        tail_size (int) - number of hashed bytes at the end of the file
+
+    Returns:
+        (list) size of the file, hex digest of its tail
+    """
+    with open(output_file, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(size - tail_size, 0))
+        return [size, hashlib.sha256(f.read()).hexdigest()]
+
+def incremental_file(input_file, output_file, keep_spaces=False, remove_numbers=False, lower=False, chunk_size=CHUNK_SIZE,
+                     encoding=None):
+    """
+    Cleans file and puts it into collumns, processing only bytes appended
+    since the previous run. Checkpoint (input offset, line and collumn of
+    the output, unfinished line and SHA-256 of processed input prefix) is
+    kept in output_file + '.ckpt' with size and SHA-256 of the end of the
+    output. If the prefix, options or output changed, whole file is
+    processed again. Input must be encoded in UTF-8 or a single-byte
+    encoding (see split_encoding).
+
+    Parameters:
+        input_file (string) - name of an input file
+        output_file (string) - name of an output file
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+        chunk_size (int) - number of bytes read at once
+        encoding (string) - file encoding (default: locale encoding, as in other modes)
+
+    Returns:
+        (int) offset in the input file from which processing started
+
+    Raises:
+        TypeError: input_file/output_file is not a string
+        ValueError: chunk_size is not positive or encoding is not supported
+    """
+    if type(input_file) != str or type(output_file) != str:
+        raise TypeError
+    if chunk_size <= 0:
+        raise ValueError
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    utf8 = split_encoding(encoding)
+
+    options = [keep_spaces, remove_numbers, lower, codecs.lookup(encoding).name]
+    checkpoint = load_checkpoint(output_file)
+    hasher = hashlib.sha256()
+
+    with open(input_file, 'rb') as fin:
+        # sprawdzenie, czy przetworzony początek pliku się nie zmienił
+        resume = checkpoint is not None and checkpoint['options'] == options and\
+                 os.path.isfile(output_file) and\
+                 checkpoint.get('output') == output_state(output_file) and\
+                 os.path.getsize(input_file) >= checkpoint['offset']
+        if resume:
+            left = checkpoint['offset']
+            while left > 0:
+                data = fin.read(min(chunk_size, left))
+                if not data:
+                    break
+                hasher.update(data)
+                left -= len(data)
+            resume = hasher.hexdigest() == checkpoint['sha256']
+
+        if resume:
+            offset = checkpoint['offset']
+            chars = 35*checkpoint['line'] + checkpoint['column']
+            carry = checkpoint['carry']
+            # usunięcie niedokończonej linii, zostanie zapisana jeszcze raz
+            if carry:
+                cut = len(col_text(carry)) + (len(os.linesep) if checkpoint['line'] else 0)
+                with open(output_file, 'r+b') as fout:
+                    fout.truncate(os.path.getsize(output_file) - cut)
+        else:
+            offset = 0
+            chars = 0
+            carry = ''
+            fin.seek(0)
+            hasher = hashlib.sha256()
+
+        start = offset
+        tail = carry
+
+        def cleaned_chunks():
+            nonlocal offset, chars, tail
+            pending = b''
+            data = fin.read(chunk_size)
+            while data:
+                data = pending + data
+                cut = len(data) - (utf8_tail(data) if utf8 else 0)
+                pending = data[cut:]
+                hasher.update(data[:cut])
+                offset += cut
+                text = normalize(data[:cut].decode(encoding), keep_spaces, remove_numbers, lower)
+                chars += len(text)
+                tail = (tail + text)[-35:]
+                yield text
+                data = fin.read(chunk_size)
+
+        with open(output_file, 'a' if resume else 'w') as fout:
+            for part in col_text_stream(cleaned_chunks(), carry, chars < 35):
+                fout.write(part)
+
+    column = chars%35
+    checkpoint = {'offset': offset, 'sha256': hasher.hexdigest(),
+                  'line': chars//35, 'column': column,
+                  'carry': tail[len(tail) - column:] if column else '',
+                  'options': options, 'output': output_state(output_file)}
+    with open(output_file + '.ckpt.tmp', 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(output_file + '.ckpt.tmp', output_file + '.ckpt')
+
+    return start
+
+def normalize_shard(args):
+    """
+    Reads byte range of a file and cleans it with normalize.
+    Used by parallel_file in worker processes.
+
+    Parameters:
+        args (tuple) - filename, start, end, keep_spaces, remove_numbers, lower, encoding
+
+    Returns:
+        (string) cleaned text
+    """
+    filename, start, end, keep_spaces, remove_numbers, lower, encoding = args
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        content = f.read(end - start).decode(encoding)
+
+    return normalize(content, keep_spaces, remove_numbers, lower)
+
+def col_offset(position):
+    """
+    Returns byte offset of a character in output of col_text written
+    to a file (lines end with os.linesep).
+
+    Parameters:
+        position (int) - index of a character in cleaned text
+
+    Returns:
+        (int) offset of the character in the file
+    """
+    column = position%35
+    return position//35*(41 + len(os.linesep)) + column + column//5
+
+def col_size(length):
+    """
+    Returns size of output of col_text written to a file.
+
+    Parameters:
+        length (int) - length of cleaned text
+
+    Returns:
+        (int) size of the file in bytes
+    """
+    if length == 0:
+        return 0
+    lines = (length - 1)//35
+    # ostatnia linia ma zawsze 6 odstępów między kolumnami (także pustymi)
+    return lines*(41 + len(os.linesep)) + length - 35*lines + 6
+
+def col_part(text, start, length):
+    """
+    Puts a part of cleaned text into collumns: returns bytes of col_text
+    output (with os.linesep) from offset of its first character up to
+    offset of the next part, so parts written at col_offset(start) give
+    the same file as col_text of the whole text.
+
+    Parameters:
+        text (string) - part of cleaned text
+        start (int) - index of its first character in the whole text
+        length (int) - length of the whole text
+
+    Returns:
+        (bytes) columnized part
+    """
+    column = start%35
+    # dopełnienie do początku linii, odcinane po podziale na kolumny
+    lines = col_text('x'*column + text)
+    end = start + len(text)
+    if end < length:
+        last = end%35
+        lines = lines + '\n' if last == 0 else lines[:len(lines) - 6 + last//5]
+
+    return lines[column + column//5:].replace('\n', os.linesep).encode('ascii')
+
+def shard_length(args):
+    """
+    Returns length of a cleaned shard. Used by parallel_file in worker
+    processes (first pass).
+
+    Parameters:
+        args (tuple) - arguments of normalize_shard
+
+    Returns:
+        (int) length of cleaned text
+    """
+    return len(normalize_shard(args))
+
+def col_shard(args):
+    """
+    Cleans a shard, puts it into collumns and writes it at its offset of
+    the output file. Used by parallel_file in worker processes (second pass).
+
+    Parameters:
+        args (tuple) - arguments of normalize_shard, output file name,
+                       index of the first character of the shard, length
+                       of the whole cleaned text
+    """
+    output_file, start, length = args[-3:]
+    text = normalize_shard(args[:-3])
+    if not text:
+        return
+
+    with open(output_file, 'r+b') as f:
+        f.seek(col_offset(start))
+        f.write(col_part(text, start, length))
+
+def parallel_file(input_file, output_file, keep_spaces=False, remove_numbers=False, lower=False, jobs=None,
+                  encoding=None):
+    """
+    Cleans file and puts it into collumns using a pool of processes.
+    Input (UTF-8 or a single-byte encoding, see split_encoding) is split
+    into shards. In the first pass processes clean the shards and return
+    their lengths, prefix sums of the lengths give the first character
+    (line and collumn) of every shard. In the second pass processes clean
+    the shards again, put them into collumns and write them at their
+    offsets of a preallocated temporary file, which replaces output_file
+    only if all shards succeeded. Text is not kept in memory of the parent.
+
+    Parameters:
+        input_file (string) - name of an input file
+        output_file (string) - name of an output file
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+        jobs (int) - number of processes (default: number of CPUs)
+        encoding (string) - file encoding (default: locale encoding, as in other modes)
+
+    Raises:
+        TypeError: input_file/output_file is not a string
+        ValueError: jobs is not positive or encoding is not supported
+    """
+    if type(input_file) != str or type(output_file) != str:
+        raise TypeError
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 0:
+        raise ValueError
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    utf8 = split_encoding(encoding)
+
+    shards = max(jobs, -(-os.path.getsize(input_file)//SHARD_SIZE))
+    tasks = [(input_file, start, end, keep_spaces, remove_numbers, lower, encoding)
+             for start, end in shard_ranges(input_file, shards, utf8)]
+
+    # plik tymczasowy obok wyniku (ta sama partycja dla os.replace), osobny dla procesu
+    tmp = f'{output_file}.{os.getpid()}.tmp'
+    try:
+        with Pool(jobs) as pool:
+            starts = [0]
+            for length in pool.map(shard_length, tasks):
+                starts.append(starts[-1] + length)
+
+            with open(tmp, 'wb') as f:
+                f.truncate(col_size(starts[-1]))
+            pool.map(col_shard, [task + (tmp, start, starts[-1]) for task, start in zip(tasks, starts)])
+        os.replace(tmp, output_file)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def batch_files(pattern, exclude=None):
+    """
+    Lists files for batch mode.
+
+    Parameters:
+        pattern (string) - directory (searched recursively) or glob pattern
+        exclude (string) - directory whose files are skipped (e.g. output
+                           directory inside the input directory)
+
+    Returns:
+        (tuple) base directory, sorted list of file names
+
+    Raises:
+        TypeError: pattern is not a string
+    """
+    if type(pattern) != str:
+        raise TypeError
+
+    def excluded(name):
+        return exclude is not None and\
+               os.path.commonpath([os.path.realpath(name), os.path.realpath(exclude)]) == os.path.realpath(exclude)
+
+    if os.path.isdir(pattern):
+        files = []
+        for root, dirs, names in os.walk(pattern):
+            dirs[:] = [d for d in dirs if not excluded(os.path.join(root, d))]
+            files.extend(os.path.join(root, name) for name in names)
+        return pattern, sorted(files)
+
+    files = sorted(f for f in glob.glob(pattern, recursive=True) if os.path.isfile(f) and not excluded(f))
+    if not files:
+        return '.', []
+
+    return os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]), files
+
+def init_batch_worker(keep_spaces, remove_numbers, lower):
+    """
+    Prepares worker process for batch mode: translation table is built
+    once per worker instead of once per file.
+    """
+    clean_table(keep_spaces, remove_numbers, lower)
+
+def clean_batch_file(args):
+    """
+    Cleans one file in batch mode. Errors are returned instead of raised,
+    so one broken file does not stop the whole batch. Result is written to
+    a temporary file, which replaces the output only if the file was
+    processed, so a failed file leaves no empty or partial output. File
+    whose output path points to the input itself is not processed.
+
+    Parameters:
+        args (tuple) - input_file, output_file, keep_spaces, remove_numbers, lower
+
+    Returns:
+        (tuple) input_file, error message or None
+    """
+    input_file, output_file, keep_spaces, remove_numbers, lower = args
+    try:
+        if os.path.realpath(output_file) == os.path.realpath(input_file) or\
+           (os.path.exists(output_file) and os.path.samefile(output_file, input_file)):
+            raise ValueError('plik wyjściowy jest plikiem wejściowym')
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        tmp = f'{output_file}.{os.getpid()}.tmp'
+        try:
+            stream_file(input_file, tmp, keep_spaces, remove_numbers, lower)
+            os.replace(tmp, output_file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    except Exception as e:
+        return input_file, f'{type(e).__name__}: {e}'
+
+    return input_file, None
+
+def batch(pattern, output_dir, keep_spaces=False, remove_numbers=False, lower=False, jobs=None):
+    """
+    Cleans every file matching pattern using a pool of processes. Results
+    are saved in output_dir with the same relative paths, files already
+    inside output_dir are skipped.
+
+    Parameters:
+        pattern (string) - directory (searched recursively) or glob pattern
+        output_dir (string) - name of an output directory
+        keep_spaces (bool) - if spaces are kept
+        remove_numbers (bool) - if digits are removed
+        lower (bool) - if letters are changed to lowercase
+        jobs (int) - number of processes (default: number of CPUs)
+
+    Yields:
+        (tuple) input_file, error message or None - in order of completion
+
+    Raises:
+        TypeError: pattern/output_dir is not a string
+        ValueError: jobs is not positive
+    """
+    if type(pattern) != str or type(output_dir) != str:
+        raise TypeError
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 0:
+        raise ValueError
+
+    base, files = batch_files(pattern, output_dir)
+    tasks = [(f, os.path.join(output_dir, os.path.relpath(os.path.abspath(f), os.path.abspath(base))),
+              keep_spaces, remove_numbers, lower) for f in files]
+
+    with Pool(jobs, init_batch_worker, (keep_spaces, remove_numbers, lower)) as pool:
+        yield from pool.imap_unordered(clean_batch_file, tasks, chunksize=16)
+
+def text_size(text):
+    """
+    Returns size of text encoded in UTF-8 (without encoding pure ASCII text).
+
+    Parameters:
+        text (string) - text
+
+    Returns:
+        (int) size in bytes
+    """
+    return len(text) if text.isascii() else len(text.encode('utf8'))
+
+class StageReport(object):
+    """
+    Measures wall time and sizes of data going in and out of pipeline stages.
+    Disabled report only calls the stages.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+
+    def measure(self, name, func, *args, in_file=None, out_file=None):
+        """
+        Calls func(*args) and records its time and throughput.
+
+        Parameters:
+            name (string) - name of a stage
+            func (function) - stage
+            in_file (string) - file read by the stage (default: size of args[0])
+            out_file (string) - file written by the stage (default: size of result)
+
+        Returns:
+            result of func
+        """
+        if not self.enabled:
+            return func(*args)
+
+        if in_file is not None:
+            bytes_in = os.path.getsize(in_file)
+        else:
+            bytes_in = text_size(args[0]) if args and type(args[0]) == str else 0
+
+        time_0 = perf_counter()
+        result = func(*args)
+        elapsed = perf_counter() - time_0
+
+        if out_file is not None:
+            bytes_out = os.path.getsize(out_file)
+        else:
+            bytes_out = text_size(result) if type(result) == str else 0
+
+        self.stages.append({'stage': name, 'time': elapsed, 'bytes_in': bytes_in, 'bytes_out': bytes_out,
+                            'mb_per_s': bytes_in/1e6/elapsed if elapsed > 0 else None})
+        return result
+
+    def as_dict(self):
+        """
+        Returns:
+            (dict) measured stages and their total
+        """
+        elapsed = sum(stage['time'] for stage in self.stages)
+        bytes_in = self.stages[0]['bytes_in'] if self.stages else 0
+        return {'stages': self.stages,
+                'total': {'time': elapsed, 'bytes_in': bytes_in,
+                          'bytes_out': self.stages[-1]['bytes_out'] if self.stages else 0,
+                          'mb_per_s': bytes_in/1e6/elapsed if elapsed > 0 else None}}
+
+    def as_text(self):
+        """
+        Returns:
+            (string) measured stages as a table
+        """
+        report = self.as_dict()
+        lines = [f'{"etap":<16} {"czas [ms]":>10} {"wejście [B]":>12} {"wyjście [B]":>12} {"MB/s":>9}']
+        for stage in report['stages'] + [dict(report['total'], stage='razem')]:
+            mb_per_s = '-' if stage['mb_per_s'] is None else f'{stage["mb_per_s"]:.2f}'
+            lines.append(f'{stage["stage"]:<16} {1000*stage["time"]:>10.2f} {stage["bytes_in"]:>12} '
+                         f'{stage["bytes_out"]:>12} {mb_per_s:>9}')
+        return '\n'.join(lines)
+
+def benchmark(filenames, repeats=3):
+    """
+    Compares speed of clean_text, clean_num and clean_acc chain with
+    normalize for every set of options. Prints results.
+
+    Parameters:
+        filenames (list of strings) - names of test files
+        repeats (int) - number of measurements (best one is printed)
+    """
+    for filename in filenames:
+        plaintext = open_file(filename)
+        size = len(plaintext.encode('utf8'))/1e6
+        print(f'Plik {filename} ({size:.2f} MB)')
+        for keep_spaces in (False, True):
+            for remove_numbers in (False, True):
+                for lower in (False, True):
+                    time_chain = time_fused = float('inf')
+                    for _ in range(repeats):
+                        time_0 = perf_counter()
+                        chain = clean_text(plaintext, keep_spaces)
+                        if remove_numbers:
+                            chain = clean_num(chain)
+                        chain = clean_acc(chain, lower)
+                        time_1 = perf_counter()
+                        fused = normalize(plaintext, keep_spaces, remove_numbers, lower)
+                        time_2 = perf_counter()
+                        time_chain = min(time_chain, time_1 - time_0)
+                        time_fused = min(time_fused, time_2 - time_1)
+
+                    print(f'  keep_spaces={keep_spaces:d} remove_numbers={remove_numbers:d} lower={lower:d}: '
+                          f'łańcuch {size/time_chain:8.2f} MB/s, '
+                          f'normalize {size/time_fused:8.2f} MB/s, '
+                          f'przyspieszenie x{time_chain/time_fused:.1f}'
+                          f'{"" if chain == fused else ", RÓŻNE WYNIKI"}')
+
+if __name__ == '__main__':
+    input_file = ''
+    output_file = ''
+    remove_numbers = False
+    lower = False
+    keep_spaces = False
+    stream = False
+    chunk_size = CHUNK_SIZE
+    run_benchmark = False
+    jobs = None
+    batch_pattern = None
+    incremental = False
+    use_cache = False
+    staged = False
+    report_format = None
+    report_file = None
+
+    i = 0
+    while i < len(sys.argv):
+        if sys.argv[i] == '-f' and i + 1 < len(sys.argv):
+            input_file = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] == '-o' and i + 1 < len(sys.argv):
+            output_file = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] == '--remove_numbers':
+            remove_numbers = True
+        if sys.argv[i] == '--lower':
+            lower = True
+        if sys.argv[i] == '--keep_spaces':
+            keep_spaces = True
+        if sys.argv[i] == '--stream':
+            stream = True
+        if sys.argv[i] == '--incremental':
+            incremental = True
+        if sys.argv[i] == '--cache':
+            use_cache = True
+        if sys.argv[i] == '--chunk_size' and i + 1 < len(sys.argv):
+            chunk_size = int(sys.argv[i+1])
+            i += 1
+        if sys.argv[i] == '--benchmark':
+            run_benchmark = True
+        if sys.argv[i] == '--batch' and i + 1 < len(sys.argv):
+            batch_pattern = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] == '--jobs' and i + 1 < len(sys.argv):
+            jobs = int(sys.argv[i+1])
+            i += 1
+        if sys.argv[i] == '--staged':
+            staged = True
+        if sys.argv[i] == '--report' and i + 1 < len(sys.argv):
+            report_format = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] == '--report_file' and i + 1 < len(sys.argv):
+            report_file = sys.argv[i+1]
+            i += 1
+        i += 1
+
+    if run_benchmark:
+        txts = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'txts')
+        benchmark([input_file] if input_file else [os.path.join(txts, 'rand1Mchars.txt'),
+                                                   os.path.join(txts, 'lab1_output3.txt')])
+        sys.exit()
+
+    if batch_pattern is not None:
+        # tryb wsadowy nie pyta o opcje, błędy są zgłaszane dla każdego pliku osobno
+        if not output_file:
+            print('Tryb wsadowy wymaga katalogu wyjściowego: --batch <wzorzec> -o <katalog>')
+            sys.exit(1)
+        files_done = 0
+        errors = 0
+        for filename, error in batch(batch_pattern, output_file, keep_spaces, remove_numbers, lower, jobs):
+            files_done += 1
+            if error is not None:
+                errors += 1
+                print(f'Błąd: {filename}: {error}')
+        print(f'Przetworzono plików: {files_done}, błędów: {errors}')
+        sys.exit(1 if errors else 0)
+
+    done = False
+    while not done:
+        report = StageReport(report_format is not None)
+        try:
+            if jobs is not None:
+                print(f'Przetwarzanie równoległe ({jobs} procesów) {input_file} -> {output_file}... ', end='')
+                report.measure('parallel_file', parallel_file, input_file, output_file,
+                               keep_spaces, remove_numbers, lower, jobs, locale.getpreferredencoding(False),
+                               in_file=input_file, out_file=output_file)
+                print('gotowe')
+            elif incremental:
+                print(f'Przetwarzanie przyrostowe {input_file} -> {output_file}... ', end='')
+                start = report.measure('incremental_file', incremental_file, input_file, output_file,
+                                       keep_spaces, remove_numbers, lower, chunk_size,
+                                       locale.getpreferredencoding(False), in_file=input_file, out_file=output_file)
+                print(f'gotowe (od bajtu {start})')
+            elif stream:
+                print(f'Przetwarzanie strumieniowe {input_file} -> {output_file}... ', end='')
+                report.measure('stream_file', stream_file, input_file, output_file,
+                               keep_spaces, remove_numbers, lower, chunk_size, in_file=input_file, out_file=output_file)
+                print('gotowe')
+            else:
+                if use_cache:
+                    print(f'Wczytywanie oczyszczonego pliku {input_file} (pamięć podręczna)... ', end='')
+                    options = {'encoding': locale.getpreferredencoding(False), 'keep_spaces': keep_spaces,
+                               'remove_numbers': remove_numbers, 'lower': lower}
+                    plaintext = report.measure('cached_clean', cache.cached_clean, input_file, options,
+                                               lambda text: normalize(text, keep_spaces, remove_numbers, lower),
+                                               in_file=input_file)
+                    print('gotowe')
+                elif staged:
+                    # kolejne etapy osobno (np. do pomiaru każdego z nich)
+                    print(f'Otwieranie pliku {input_file}... ', end='')
+                    plaintext = report.measure('open_file', open_file, input_file, in_file=input_file)
+                    print('gotowe')
+
+                    print('Usuwanie białych znaków... ', end='')
+                    plaintext = report.measure('clean_text', clean_text, plaintext, keep_spaces)
+                    print('gotowe')
+
+                    if remove_numbers:
+                        print('Usuwanie cyfr... ', end='')
+                        plaintext = report.measure('clean_num', clean_num, plaintext)
+                        print('gotowe')
+
+                    print('Usuwanie znaków diakrytycznych... ', end='')
+                    plaintext = report.measure('clean_acc', clean_acc, plaintext, lower)
+                    print('gotowe')
+                else:
+                    print(f'Otwieranie pliku {input_file}, usuwanie białych znaków, cyfr i znaków diakrytycznych... ', end='')
+                    plaintext = report.measure('clean_file', clean_file, input_file, keep_spaces, remove_numbers, lower,
+                                               locale.getpreferredencoding(False), chunk_size, in_file=input_file)
+                    print('gotowe')
+
+                print('Przekształcanie na kolumny... ', end='')
+                plaintext = report.measure('col_text', col_text, plaintext)
+                print('gotowe')
+
+                print(f'Zapis wyniku do pliku {output_file}... ', end='')
+                report.measure('write_to_file', write_to_file, plaintext, output_file, out_file=output_file)
+                print('gotowe')
+
+            done = True
+        except:
+            print('Wystąpił błąd. Podaj opcje jeszcze raz. Wpisane "exit" powoduje wyjście z programu')
+            input_file = input('Plik wejściowy: ')
+            if 'exit' == input_file.lower():
+                sys.exit()
+            output_file = input('Plik wyjściowy: ')
+            if 'exit' == output_file.lower():
+                sys.exit()
+            remove_numbers = input('Usuwanie liczb [y/n]: ')
+            if 'exit' == remove_numbers.lower():
+                sys.exit()
+            lower = input('Małe litery [y/n]: ')
+            if 'exit' == lower.lower():
+                sys.exit()
+            keep_spaces = input('Zachowanie spacji [y/n]: ')
+            if 'exit' == keep_spaces.lower():
+                sys.exit()
+
+            remove_numbers = remove_numbers in 'yY'
+            lower = lower in 'yY'
+            keep_spaces = keep_spaces in 'yY'
+    if report_format is not None:
+        text = json.dumps(report.as_dict(), indent=2) if report_format == 'json' else report.as_text()
+        if report_file is not None:
+            with open(report_file, 'w') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
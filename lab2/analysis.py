@@ -0,0 +1,773 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import io
+from itertools import islice
+from multiprocessing import Pool
+import numpy as np
+
+import lab2
+import ngrams
+from common import keys
+
+A = ord('a')
+
+# rozmiar fragmentu (w bajtach) czytanego przy liczeniu histogramu
+CHUNK_SIZE = 1 << 20
+
+# liczba równo rozłożonych fragmentów pliku czytanych przy próbkowaniu
+SAMPLE_BLOCKS = 64
+
+# częstości liter (%) w tekście po oczyszczeniu (litery polskie zamienione
+# na łacińskie odpowiedniki, jak w unidecode)
+FREQUENCIES = {
+    'pl': (9.90, 1.47, 4.36, 3.25, 8.77, 0.30, 1.42, 1.08, 8.21, 2.28, 3.51, 3.92, 2.80,
+           5.72, 7.75, 3.13, 0.14, 4.69, 4.98, 3.98, 2.50, 0.04, 4.65, 0.02, 3.76, 6.53),
+    'en': (8.17, 1.49, 2.78, 4.25, 12.70, 2.23, 2.02, 6.09, 6.97, 0.15, 0.77, 4.03, 2.41,
+           6.75, 7.51, 1.93, 0.10, 5.99, 6.33, 9.06, 2.76, 0.98, 2.36, 0.15, 1.97, 0.07),
+}
+
+def reference(lang='pl'):
+    """
+    Returns reference letter probabilities for a language.
+    Parameters:
+        lang (string) - language code (key of FREQUENCIES)
+    Returns:
+        probabilities of letters a-z (numpy.ndarray of float64, sum 1)
+    Raises:
+        ValueError: language is not available
+    """
+    if lang not in FREQUENCIES:
+        raise ValueError
+
+    freq = np.array(FREQUENCIES[lang])
+    return freq/freq.sum()
+
+# ================ histogram
+def histogram(data):
+    """
+    Counts letters a-z (case insensitive) in text.
+    Parameters:
+        data (string or bytes-like) - text
+    Returns:
+        counts of letters a-z (numpy.ndarray of int64)
+    """
+    if type(data) == str:
+        data = data.encode('ascii', 'ignore')
+
+    counts = np.bincount(np.frombuffer(data, np.uint8), minlength=256)
+    return counts[A:A+26] + counts[ord('A'):ord('A')+26]
+
+def file_histogram(filename, sample=None, chunk_size=CHUNK_SIZE):
+    """
+    Counts letters a-z in a file, reading it in chunks. If sample is given
+    and the file is bigger, only SAMPLE_BLOCKS evenly spaced blocks of
+    sample bytes in total are read.
+    Parameters:
+        filename (string) - name of a file
+        sample (int) - number of bytes to read (default: whole file)
+        chunk_size (int) - number of bytes read at once
+    Returns:
+        counts of letters a-z (numpy.ndarray of int64)
+    Raises:
+        TypeError: filename is not a string
+        ValueError: sample or chunk_size is not positive
+    """
+    if type(filename) != str:
+        raise TypeError
+    if chunk_size <= 0 or (sample is not None and sample <= 0):
+        raise ValueError
+
+    size = os.path.getsize(filename)
+    if sample is None or sample >= size:
+        blocks = [(pos, chunk_size) for pos in range(0, size, chunk_size)]
+    else:
+        block = max(sample//SAMPLE_BLOCKS, 1)
+        count = min(SAMPLE_BLOCKS, sample)
+        blocks = [(size*i//count, block) for i in range(count)]
+
+    hist = np.zeros(26, np.int64)
+    with open(filename, 'rb') as f:
+        for pos, length in blocks:
+            f.seek(pos)
+            hist += histogram(f.read(length))
+
+    return hist
+
+# ================ cesar / rot-n
+def shift_scores(hist, ref):
+    """
+    Scores all 26 shifts at once: histogram of text decrypted with shift s
+    is the histogram rotated by s, and it is compared with the reference
+    using chi-squared statistic.
+    Parameters:
+        hist (numpy.ndarray) - counts of letters a-z in ciphertext
+        ref (numpy.ndarray) - reference letter probabilities
+    Returns:
+        chi-squared for shifts 0 - 25 (numpy.ndarray of float64), lower is better
+    Raises:
+        ValueError: histogram is empty
+    """
+    total = hist.sum()
+    if total == 0:
+        raise ValueError
+
+    # observed[s, p] - liczba liter p w tekście odszyfrowanym przesunięciem s
+    observed = hist[(np.arange(26)[:, None] + np.arange(26)) % 26]
+    expected = total*ref
+
+    return ((observed - expected)**2/expected).sum(axis=1)
+
+def break_shift(hist, ref):
+    """
+    Finds the most probable shift of a Caesar/ROT-N ciphertext.
+    Parameters:
+        hist (numpy.ndarray) - counts of letters a-z in ciphertext
+        ref (numpy.ndarray) - reference letter probabilities
+    Returns:
+        shifts sorted from the best (numpy.ndarray), their chi-squared (numpy.ndarray)
+    Raises:
+        ValueError: histogram is empty
+    """
+    scores = shift_scores(hist, ref)
+    order = np.argsort(scores, kind='stable')
+
+    return order, scores[order]
+
+# ================ viganere
+def residues(data):
+    """
+    Converts letters of text (case insensitive) to numbers 0 - 25,
+    other characters are skipped.
+    Parameters:
+        data (string or bytes-like) - text
+    Returns:
+        letter numbers (numpy.ndarray of uint8)
+    """
+    if type(data) == str:
+        data = data.encode('ascii', 'ignore')
+
+    codes = np.frombuffer(data, np.uint8) | np.uint8(0x20)
+    codes = codes[(codes >= A) & (codes < A + 26)]
+
+    return codes - np.uint8(A)
+
+def file_residues(filename, sample=None):
+    """
+    Reads letters of a file (or of its first sample bytes) as numbers 0 - 25.
+    Parameters:
+        filename (string) - name of a file
+        sample (int) - number of bytes to read (default: whole file)
+    Returns:
+        letter numbers (numpy.ndarray of uint8)
+    Raises:
+        TypeError: filename is not a string
+    """
+    if type(filename) != str:
+        raise TypeError
+
+    with open(filename, 'rb') as f:
+        return residues(f.read(-1 if sample is None else sample))
+
+def coincidence(res, max_period=40):
+    """
+    Computes mean index of coincidence of columns of text for every
+    candidate key length. For period p text is viewed as rows of p letters
+    and letters of all columns are counted with one bincount.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        max_period (int) - longest checked key length
+    Returns:
+        index of coincidence for periods 1 - max_period (numpy.ndarray of float64,
+        element 0 for period 1)
+    """
+    ioc = np.zeros(max_period)
+    for period in range(1, max_period + 1):
+        rows = len(res)//period
+        if rows < 2:
+            break
+        columns = res[:rows*period].reshape(rows, period).astype(np.int64) + 26*np.arange(period)
+        counts = np.bincount(columns.ravel(), minlength=26*period)
+        ioc[period - 1] = (counts*(counts - 1)).sum()/(period*rows*(rows - 1))
+
+    return ioc
+
+def kasiski(res, max_period=40, limit=1 << 18):
+    """
+    Kasiski examination: distances between consecutive occurrences of every
+    repeated trigram are collected in one pass, with an index of the last
+    occurrence of every trigram (a table addressed by trigram number,
+    26^3 entries), and for every candidate key length the share of
+    distances divisible by it is compared with the share expected by
+    chance (1/p). Used only for display (see key_length).
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        max_period (int) - longest checked key length
+        limit (int) - number of letters examined (from the beginning)
+    Returns:
+        score for periods 1 - max_period (numpy.ndarray of float64), about 1
+        for random distances, higher for key length and its multiples
+    """
+    res = res[:limit].astype(np.int64)
+    scores = np.zeros(max_period)
+    if len(res) < 3:
+        return scores
+
+    trigrams = res[:-2]*676 + res[1:-1]*26 + res[2:]
+    last = [-1]*26**3
+    distances = []
+    for position, trigram in enumerate(trigrams.tolist()):
+        if last[trigram] >= 0:
+            distances.append(position - last[trigram])
+        last[trigram] = position
+    if not distances:
+        return scores
+
+    distances = np.array(distances)
+
+    periods = np.arange(1, max_period + 1)
+    for period in periods:
+        scores[period - 1] = np.count_nonzero(distances % period == 0)/len(distances)*period
+
+    return scores
+
+def key_length(ioc):
+    """
+    Chooses key length from indices of coincidence: the shortest period
+    whose index is close to the highest one (multiples of the key length
+    score as high as the length itself, periods sharing only some of its
+    factors lie between them and the index of random text, 1/26).
+    Kasiski scores are not used (the program shows them next to the indices):
+    the shortest period already rules out multiples of the key length and
+    on short ciphertexts there are too few repeated trigrams to break ties.
+    Parameters:
+        ioc (numpy.ndarray) - result of coincidence
+    Returns:
+        key length (int), 1 if no period has any coincidence (text too short)
+    """
+    if ioc.max() <= 0:
+        return 1
+
+    threshold = ioc.max() - (ioc.max() - 1/26)/8
+
+    return int(np.flatnonzero(ioc >= threshold)[0]) + 1
+
+def recover_key(res, length, ref):
+    """
+    Recovers key of known length, breaking every column as a Caesar cipher.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        length (int) - key length
+        ref (numpy.ndarray) - reference letter probabilities
+    Returns:
+        key (string)
+    """
+    key = ''
+    for column in range(length):
+        hist = np.bincount(res[column::length], minlength=26)
+        key += chr(A + int(break_shift(hist, ref)[0][0]))
+
+    return key
+
+def break_vigenere(res, ref, max_period=40):
+    """
+    Finds key length and key of a Viganere ciphertext.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        ref (numpy.ndarray) - reference letter probabilities
+        max_period (int) - longest checked key length
+    Returns:
+        key (string), index of coincidence for every period (numpy.ndarray)
+    Raises:
+        ValueError: ciphertext has no letters
+    """
+    if len(res) == 0:
+        raise ValueError
+
+    max_period = max(1, min(max_period, len(res)//2))
+    ioc = coincidence(res, max_period)
+    length = key_length(ioc)
+
+    return recover_key(res, length, ref), ioc
+
+# ================ permutation
+# wagi liter czwórki w jej numerze (zapis w systemie o podstawie 26)
+QUADGRAM_WEIGHTS = np.array([26**3, 26**2, 26, 1])
+
+def quadgrams(res):
+    """
+    Numbers all quadgrams of text (base 26, first letter most significant).
+    Parameters:
+        res (numpy.ndarray) - letter numbers
+    Returns:
+        quadgram numbers 0 - 26^4-1 (numpy.ndarray of int64)
+    """
+    res = res.astype(np.int64)
+    return res[:-3]*26**3 + res[1:-2]*26**2 + res[2:-1]*26 + res[3:]
+
+def quadgram_table(res):
+    """
+    Builds table of quadgram log-probabilities from a corpus. Quadgrams
+    missing from the corpus get probability of 0.01 occurrence.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of corpus text
+    Returns:
+        log10 probabilities indexed by quadgram number (numpy.ndarray of float32)
+    Raises:
+        ValueError: corpus is shorter than 4 letters
+    """
+    return ngrams.log_probabilities(np.bincount(quadgrams(res), minlength=26**4))
+
+class PermutationClimber(object):
+    """
+    Hill climbing over keys of the permutation cipher. Ciphertext is reduced
+    to its distinct quadgrams with their counts, and for every pair of
+    letters the quadgrams containing any of them are listed once, so after
+    swapping two letters of the key only those quadgrams are rescored.
+    Key maps ciphertext letters to plaintext letters (inverse permutation).
+    """
+    def __init__(self, res, table):
+        codes, self.counts = np.unique(quadgrams(res), return_counts=True)
+        self.letters = (codes[:, None]//QUADGRAM_WEIGHTS) % 26
+        self.table = table
+
+        rows = [np.flatnonzero((self.letters == c).any(axis=1)) for c in range(26)]
+        self.pairs = [(x, y) for x in range(26) for y in range(x + 1, 26)]
+        self.pair_rows = [np.union1d(rows[x], rows[y]) for x, y in self.pairs]
+
+    def score(self, key):
+        """
+        Scores key (sum of log-probabilities of decrypted quadgrams).
+        Parameters:
+            key (numpy.ndarray) - plaintext letter for every ciphertext letter
+        Returns:
+            score (float), higher is better
+        """
+        return float((self.counts*self.table[key[self.letters] @ QUADGRAM_WEIGHTS]).sum())
+
+    def climb(self, key, rng):
+        """
+        Swaps pairs of key letters (in random order) as long as any swap
+        improves the score.
+        Parameters:
+            key (numpy.ndarray) - starting key
+            rng (numpy.random.Generator) - generator of swap order
+        Returns:
+            score (float), best key found (numpy.ndarray)
+        """
+        key = np.array(key)
+        plain = key[self.letters]
+        codes = plain @ QUADGRAM_WEIGHTS
+        score = float((self.counts*self.table[codes]).sum())
+
+        improved = True
+        while improved:
+            improved = False
+            for pair in rng.permutation(len(self.pairs)):
+                x, y = self.pairs[pair]
+                rows = self.pair_rows[pair]
+                old = plain[rows]
+                new = old.copy()
+                new[old == key[x]] = key[y]
+                new[old == key[y]] = key[x]
+                new_codes = new @ QUADGRAM_WEIGHTS
+                delta = float((self.counts[rows]*(self.table[new_codes] - self.table[codes[rows]])).sum())
+                if delta > 0:
+                    plain[rows] = new
+                    codes[rows] = new_codes
+                    score += delta
+                    key[x], key[y] = key[y], key[x]
+                    improved = True
+
+        return score, key
+
+# solver w procesie roboczym (budowany raz przez init_climber)
+_climber = None
+
+def init_climber(res, table):
+    """
+    Initializes worker process of break_permutation.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        table (numpy.ndarray) - quadgram log-probabilities
+    """
+    global _climber
+    _climber = PermutationClimber(res, table)
+
+def climb_restart(args):
+    """
+    Runs one restart of hill climbing (in a worker process).
+    Parameters:
+        args (tuple) - starting key, seed of swap order
+    Returns:
+        score (float), key (numpy.ndarray)
+    """
+    key, seed = args
+    return _climber.climb(key, np.random.default_rng(seed))
+
+def frequency_key(res, ref):
+    """
+    Returns key matching letters of ciphertext and language ordered by frequency.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        ref (numpy.ndarray) - reference letter probabilities
+    Returns:
+        key (numpy.ndarray)
+    """
+    key = np.empty(26, np.int64)
+    key[np.argsort(-np.bincount(res, minlength=26), kind='stable')] = np.argsort(-ref, kind='stable')
+
+    return key
+
+def break_permutation(res, table, ref, restarts=8, jobs=None, limit=1 << 16):
+    """
+    Recovers key of the permutation cipher with hill climbing restarted
+    from several keys (the frequency-matched one and random ones)
+    in a pool of processes.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        table (numpy.ndarray) - quadgram log-probabilities
+        ref (numpy.ndarray) - reference letter probabilities
+        restarts (int) - number of restarts
+        jobs (int) - number of processes (default: number of CPUs)
+        limit (int) - number of ciphertext letters used (from the beginning)
+    Returns:
+        permutation used to encrypt the text (string), its score (float)
+    Raises:
+        ValueError: ciphertext is shorter than 4 letters or restarts is not positive
+    """
+    res = res[:limit]
+    if len(res) < 4 or restarts <= 0:
+        raise ValueError
+
+    starts = [frequency_key(res, ref)] + list(keys.random_permutations(restarts - 1).astype(np.int64) - A)
+    with Pool(jobs, init_climber, (res, table)) as pool:
+        results = pool.map(climb_restart, [(key, seed) for seed, key in enumerate(starts)])
+
+    score, key = max(results, key=lambda result: result[0])
+    # permutacja szyfrująca jest odwrotna do klucza
+    return bytes((np.argsort(key) + A).astype(np.uint8)).decode('ascii'), score
+
+# ================ dictionary
+# liczba słów z listy oceniana w jednym zadaniu procesu roboczego
+WORD_BATCH = 1 << 16
+
+def pair_scores(res, table, length):
+    """
+    For key length L and every column j < L computes score of decrypting
+    pairs of letters starting in column j with key letters a (column j)
+    and b (column j+1): S[j, a, b] = sum of bigram log-probabilities of
+    decrypted pairs. All 26x26 key letter pairs are scored at once as
+    a circular convolution of the pair counts with the table (FFT).
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        table (numpy.ndarray) - bigram log-probabilities (26^2)
+        length (int) - key length
+    Returns:
+        scores (numpy.ndarray of float64, shape (length, 26, 26))
+    """
+    res = res.astype(np.int64)
+    columns = np.arange(len(res) - 1) % length
+    counts = np.bincount(columns*676 + res[:-1]*26 + res[1:], minlength=length*676).reshape(length, 26, 26)
+    # S[a, b] = sum C[c1, c2]*T[c1 - a, c2 - b] = (C splot T[-x, -y])[a, b]
+    flipped = np.roll(np.asarray(table, np.float64).reshape(26, 26)[::-1, ::-1], 1, axis=(0, 1))
+
+    return np.fft.ifft2(np.fft.fft2(counts)*np.fft.fft2(flipped)).real
+
+def trie_scores(words, scores):
+    """
+    Scores keys of the same length. Keys are sorted, so the ones sharing
+    a prefix are neighbours and form nodes of a prefix trie: on every
+    depth only the first key of a node adds its pair score, the rest
+    copy the partial score of the node.
+    Parameters:
+        words (numpy.ndarray) - sorted keys as letter numbers (shape (count, L))
+        scores (numpy.ndarray) - result of pair_scores for length L
+    Returns:
+        score of every key (numpy.ndarray of float64)
+    """
+    count, length = words.shape
+    differ = words[1:] != words[:-1]
+    # długość wspólnego przedrostka z poprzednim kluczem
+    common = np.concatenate(([0], np.where(differ.any(axis=1), differ.argmax(axis=1), length)))
+
+    partial = np.zeros(count)
+    for depth in range(1, length):
+        starts = common <= depth
+        nodes = np.flatnonzero(starts)
+        values = partial[nodes] + scores[depth - 1][words[nodes, depth - 1], words[nodes, depth]]
+        partial = values[np.cumsum(starts) - 1]
+
+    # para z ostatniej kolumny przechodzi do pierwszej kolumny kolejnego wiersza
+    return partial + scores[length - 1][words[:, length - 1], words[:, 0]]
+
+# dane atakującego w procesie roboczym (ustawiane przez init_dictionary)
+_dictionary = {}
+
+def init_dictionary(res, table):
+    """
+    Initializes worker process of dictionary_attack.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext sample
+        table (numpy.ndarray) - bigram log-probabilities
+    """
+    _dictionary.clear()
+    _dictionary.update(res=res, table=table, scores={})
+
+def score_words(words):
+    """
+    Finds the best key in a batch of words (in a worker process). Words are
+    grouped by length, pair scores of every length are computed once per
+    process.
+    Parameters:
+        words (list of strings) - candidate keys (lowercase letters)
+    Returns:
+        best mean bigram log-probability (float), best key (string)
+    """
+    res = _dictionary['res']
+    best = (-np.inf, None)
+    for length in sorted(set(map(len, words))):
+        group = sorted(word for word in words if len(word) == length)
+        if length not in _dictionary['scores']:
+            _dictionary['scores'][length] = pair_scores(res, _dictionary['table'], length)
+        letters = (np.frombuffer(''.join(group).encode('ascii'), np.uint8).reshape(-1, length) - A).astype(np.intp)
+        scores = trie_scores(letters, _dictionary['scores'][length])
+        i = int(np.argmax(scores))
+        best = max(best, (scores[i]/(len(res) - 1), group[i]))
+
+    return best
+
+def read_words(filename, batch=WORD_BATCH):
+    """
+    Reads wordlist in batches, keeping words made of letters a-z only
+    (after changing them to lowercase).
+    Parameters:
+        filename (string) - wordlist, one word per line
+        batch (int) - number of words in a batch
+    Returns:
+        generator of lists of words
+    """
+    words = []
+    with io.open(filename, mode='r', encoding='utf8', errors='ignore') as f:
+        for line in f:
+            word = line.strip().lower()
+            if word.isascii() and word.isalpha():
+                words.append(word)
+                if len(words) == batch:
+                    yield words
+                    words = []
+    if words:
+        yield words
+
+def bigram_threshold(table):
+    """
+    Returns default threshold of mean bigram log-probability: a quarter of
+    the way from the value expected for natural text to the one for random
+    letters.
+    Parameters:
+        table (numpy.ndarray) - bigram log-probabilities
+    Returns:
+        threshold (float)
+    """
+    table = np.asarray(table, np.float64)
+    natural = (10**table*table).sum()/(10**table).sum()
+
+    return natural - (natural - table.mean())/4
+
+def dictionary_attack(res, table, wordlist, threshold=None, jobs=None, limit=1 << 13):
+    """
+    Tries words from a wordlist as Viganere keys, scoring decryption of
+    a ciphertext sample with bigram statistics. Batches of words are scored
+    in a pool of processes, reading of the wordlist stops as soon as any
+    key reaches the threshold.
+    Parameters:
+        res (numpy.ndarray) - letter numbers of ciphertext
+        table (numpy.ndarray) - bigram log-probabilities (26^2)
+        wordlist (string) - name of a wordlist file
+        threshold (float) - mean bigram log-probability of plaintext
+                            ending the search (default: bigram_threshold)
+        jobs (int) - number of processes (default: number of CPUs)
+        limit (int) - number of ciphertext letters used (from the beginning)
+    Returns:
+        best key (string or None), its score (float), if threshold was reached (bool)
+    Raises:
+        ValueError: ciphertext is shorter than 2 letters
+    """
+    res = res[:limit]
+    if len(res) < 2:
+        raise ValueError
+    if threshold is None:
+        threshold = bigram_threshold(table)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    best = (-np.inf, None)
+    batches = read_words(wordlist)
+    with Pool(jobs, init_dictionary, (res, table)) as pool:
+        # kolejne porcje zadań, żeby nie wczytywać całej listy słów naraz
+        while best[0] < threshold:
+            wave = list(islice(batches, 2*jobs))
+            if not wave:
+                break
+            for result in pool.imap_unordered(score_words, wave):
+                best = max(best, result)
+                if best[0] >= threshold:
+                    break
+
+    return best[1], float(best[0]), bool(best[0] >= threshold)
+
+def decrypt_file(input_file, output_file, mode, key):
+    """
+    Decrypts file with lab2 cipher (cleaning it on the way).
+    Parameters:
+        input_file (string) - name of an input file
+        output_file (string) - name of an output file
+        mode (string) - lab2 decryption mode
+        key (string) - cipher key
+    """
+    with io.open(input_file, mode='r', encoding='utf8') as fin, open(output_file, 'w') as fout:
+        lab2.stream_cipher(fin, fout, mode, key)
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    input_file = None
+    output_file = None
+    lang = 'pl'
+    sample = None
+    top = 5
+    max_period = 40
+    corpus_file = None
+    ngrams_dir = None
+    wordlist = None
+    threshold = None
+    key_file = None
+    restarts = 8
+    jobs = None
+
+    i = 2
+    while i < len(sys.argv):
+        if sys.argv[i] in ('-f', '--file') and i + 1 < len(sys.argv):
+            input_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] in ('-o', '--output') and i + 1 < len(sys.argv):
+            output_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--lang' and i + 1 < len(sys.argv):
+            lang = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--sample' and i + 1 < len(sys.argv):
+            sample = int(float(sys.argv[i+1])*1e6)
+            i += 1
+        elif sys.argv[i] == '--top' and i + 1 < len(sys.argv):
+            top = int(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] == '--max_period' and i + 1 < len(sys.argv):
+            max_period = int(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] == '--corpus' and i + 1 < len(sys.argv):
+            corpus_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--ngrams' and i + 1 < len(sys.argv):
+            ngrams_dir = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] in ('-w', '--wordlist') and i + 1 < len(sys.argv):
+            wordlist = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--threshold' and i + 1 < len(sys.argv):
+            threshold = float(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] in ('-k', '--key_file') and i + 1 < len(sys.argv):
+            key_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--restarts' and i + 1 < len(sys.argv):
+            restarts = int(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] in ('-j', '--jobs') and i + 1 < len(sys.argv):
+            jobs = int(sys.argv[i+1])
+            i += 1
+        i += 1
+
+    if command not in ('caesar', 'vigenere', 'permutation', 'dictionary') or input_file is None or\
+       (command in ('permutation', 'dictionary') and corpus_file is None and ngrams_dir is None) or\
+       (command == 'dictionary' and wordlist is None):
+        print('Użycie:')
+        print('Częstości liter języka: --lang pl|en albo --ngrams <indeks z ngrams.py>')
+        print('./analysis.py caesar -f <szyfrogram> [-o <plik wyjściowy>] [--lang pl|en]')
+        print('                     [--sample <MB>] [--top <n>]')
+        print('./analysis.py vigenere -f <szyfrogram> [-o <plik wyjściowy>] [--lang pl|en]')
+        print('                       [--sample <MB>] [--top <n>] [--max_period <n>]')
+        print('./analysis.py permutation -f <szyfrogram> --corpus <tekst w języku szyfrogramu>|--ngrams <indeks>')
+        print('                          [-o <plik wyjściowy>] [-k <plik na klucz>] [--lang pl|en]')
+        print('                          [--sample <MB>] [--restarts <n>] [-j <procesy>]')
+        print('./analysis.py dictionary -f <szyfrogram> -w <lista słów> --corpus <tekst>|--ngrams <indeks>')
+        print('                         [-o <plik wyjściowy>] [-k <plik na klucz>] [--threshold <x>]')
+        print('                         [--sample <MB>] [-j <procesy>]')
+        sys.exit()
+
+    try:
+        ref = reference(lang) if ngrams_dir is None else ngrams.probabilities(ngrams.load(ngrams_dir, 1))
+
+        if command == 'caesar':
+            shifts, scores = break_shift(file_histogram(input_file, sample), ref)
+            print(f'{"przesunięcie":>12}{"klucz":>8}{"chi^2":>14}')
+            for shift, score in zip(shifts[:top], scores[:top]):
+                print(f'{shift:>12}{chr(A + shift):>8}{score:>14.2f}')
+            if output_file is not None:
+                print(f'Odszyfrowywanie przesunięciem {shifts[0]} do {output_file}... ', end='')
+                decrypt_file(input_file, output_file, 'decrypt_viganere', chr(A + shifts[0]))
+                print('gotowe')
+
+        if command == 'vigenere':
+            res = file_residues(input_file, sample)
+            key, ioc = break_vigenere(res, ref, max_period)
+            scores = kasiski(res, len(ioc))
+            print(f'{"okres":>6}{"IC":>10}{"Kasiski":>10}')
+            for period in np.argsort(-ioc, kind='stable')[:top]:
+                print(f'{period + 1:>6}{ioc[period]:>10.4f}{scores[period]:>10.2f}')
+            print(f'Długość klucza: {len(key)}')
+            print(f'Klucz: {key}')
+            if output_file is not None:
+                print(f'Odszyfrowywanie do {output_file}... ', end='')
+                decrypt_file(input_file, output_file, 'decrypt_viganere', key)
+                print('gotowe')
+
+        if command == 'permutation':
+            if ngrams_dir is not None:
+                table = ngrams.log_probabilities(ngrams.load(ngrams_dir, 4))
+            else:
+                print(f'Budowanie tablicy czwórek z {corpus_file}... ', end='', flush=True)
+                table = quadgram_table(file_residues(corpus_file))
+                print('gotowe')
+            print(f'Szukanie klucza ({restarts} startów)... ', end='', flush=True)
+            perm, score = break_permutation(file_residues(input_file, sample), table, ref, restarts, jobs)
+            print('gotowe')
+            print(f'Permutacja: {perm} (wynik {score:.2f})')
+            if key_file is not None:
+                lab2.write_to_file(perm, key_file)
+            if output_file is not None:
+                print(f'Odszyfrowywanie do {output_file}... ', end='')
+                decrypt_file(input_file, output_file, 'decrypt_permutation', perm)
+                print('gotowe')
+
+        if command == 'dictionary':
+            if ngrams_dir is not None:
+                table = ngrams.log_probabilities(ngrams.load(ngrams_dir, 2))
+            else:
+                table = ngrams.log_probabilities(np.bincount(ngrams.ngram_codes(file_residues(corpus_file), 2),
+                                                             minlength=26**2))
+            print(f'Sprawdzanie słów z {wordlist}... ', end='', flush=True)
+            key, score, found = dictionary_attack(file_residues(input_file, sample), table, wordlist, threshold, jobs)
+            print('gotowe')
+            if key is None:
+                raise ValueError('brak słów na liście')
+            print(f'Klucz: {key} (wynik {score:.3f}{"" if found else ", poniżej progu"})')
+            if key_file is not None:
+                lab2.write_to_file(key, key_file)
+            if output_file is not None:
+                print(f'Odszyfrowywanie do {output_file}... ', end='')
+                decrypt_file(input_file, output_file, 'decrypt_viganere', key)
+                print('gotowe')
+    except Exception as e:
+        print(f'Wystąpił błąd: {e}')
+        sys.exit(1)
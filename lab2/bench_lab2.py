@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import multiprocessing
+from time import perf_counter
+import numpy as np
+
+import lab2
+
+try:
+    import resource
+except ImportError:
+    # brak modułu resource (Windows) - szczytowe RSS nie jest mierzone
+    resource = None
+
+TXTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'txts')
+
+def mode_key(mode):
+    """
+    Returns key used for benchmarking given mode.
+    Parameters:
+        mode (string) - one of lab2.available_mode
+    Returns:
+        key (string) or None if mode does not need it
+    """
+    if mode not in lab2.key_required:
+        return None
+
+    return lab2.open_file(os.path.join(TXTS, 'perm_2.txt' if 'permutation' in mode else 'key.txt'))
+
+def measure(mode, size, repeats=3):
+    """
+    Measures mode on random lowercase text of given size (run in a fresh
+    process, so peak RSS belongs to this measurement only).
+    Parameters:
+        mode (string) - one of lab2.available_mode
+        size (int) - text size in bytes
+        repeats (int) - number of measurements, the shortest time is kept
+    Returns:
+        result (dict): mode, size, seconds, mb_per_s, peak_rss_mb (None if
+        the resource module is not available)
+    """
+    text = np.random.default_rng(0).integers(ord('a'), ord('z') + 1, size, np.uint8).tobytes().decode('ascii')
+    cipher = lab2.get_cipher(mode, mode_key(mode))
+
+    best = float('inf')
+    for _ in range(repeats):
+        time_0 = perf_counter()
+        cipher(text)
+        best = min(best, perf_counter() - time_0)
+
+    peak = None
+    if resource is not None:
+        # ru_maxrss w kilobajtach (Linux), w bajtach (macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/(1 << 20 if sys.platform == 'darwin' else 1024)
+    return {'mode': mode, 'size': size, 'seconds': best,
+            'mb_per_s': size/1e6/best if best > 0 else None, 'peak_rss_mb': peak}
+
+def run(modes, sizes, repeats=3):
+    """
+    Measures every mode for every size, each in a separate process.
+    Parameters:
+        modes (list of strings) - measured modes
+        sizes (list of ints) - text sizes in bytes
+        repeats (int) - number of measurements of each mode and size
+    Returns:
+        list of results (dicts, see measure)
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for mode in modes:
+        for size in sizes:
+            print(f'{mode} {size/1e6:g} MB... ', end='', flush=True)
+            with context.Pool(1) as pool:
+                results.append(pool.apply(measure, (mode, size, repeats)))
+            print(f'{results[-1]["mb_per_s"] or 0:.2f} MB/s')
+
+    return results
+
+def regressions(results, baseline, tolerance):
+    """
+    Compares results with baseline.
+    Parameters:
+        results (list of dicts) - current results
+        baseline (list of dicts) - stored results
+        tolerance (float) - allowed slowdown in percent
+    Returns:
+        list of (mode, size, baseline MB/s, current MB/s) slower than allowed
+    """
+    stored = {(result['mode'], result['size']): result['mb_per_s'] for result in baseline}
+    slower = []
+    for result in results:
+        before = stored.get((result['mode'], result['size']))
+        if before and result['mb_per_s'] is not None and result['mb_per_s'] < before*(1 - tolerance/100):
+            slower.append((result['mode'], result['size'], before, result['mb_per_s']))
+
+    return slower
+
+if __name__ == '__main__':
+    sizes = [0.001, 0.01, 0.1, 1, 10, 100]
+    modes = list(lab2.available_mode)
+    repeats = 3
+    json_file = None
+    baseline_file = None
+    tolerance = 10.0
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--sizes' and i + 1 < len(sys.argv):
+            sizes = [float(size) for size in sys.argv[i+1].split(',')]
+            i += 1
+        elif sys.argv[i] == '--modes' and i + 1 < len(sys.argv):
+            modes = sys.argv[i+1].split(',')
+            i += 1
+        elif sys.argv[i] == '--repeats' and i + 1 < len(sys.argv):
+            repeats = int(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] == '--json' and i + 1 < len(sys.argv):
+            json_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--baseline' and i + 1 < len(sys.argv):
+            baseline_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--tolerance' and i + 1 < len(sys.argv):
+            tolerance = float(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] in ('-h', '--help'):
+            print('Użycie:')
+            print('./bench_lab2.py [--sizes <MB,MB,...>] [--modes <tryb,tryb,...>] [--repeats <n>]')
+            print('                [--json <plik wynikowy>] [--baseline <plik wynikowy> [--tolerance <%>]]')
+            sys.exit()
+        i += 1
+
+    for mode in modes:
+        if mode not in lab2.available_mode:
+            print(f'Niedostępny tryb {mode}')
+            sys.exit(1)
+
+    results = run(modes, [int(size*1e6) for size in sizes], repeats)
+
+    # tabela: przepustowość (MB/s) i szczytowe zużycie pamięci (MB) dla kolejnych rozmiarów
+    print()
+    print(f'{"tryb [MB/s | RSS MB]":<24}' + ''.join(f'{size:>18g}' for size in sizes))
+    for mode in modes:
+        row = f'{mode:<24}'
+        for result in results:
+            if result['mode'] == mode:
+                peak = '-' if result['peak_rss_mb'] is None else f'{result["peak_rss_mb"]:.0f}'
+                row += f'{result["mb_per_s"] or 0:>10.2f} |{peak:>6}'
+        print(row)
+
+    if json_file is not None:
+        with open(json_file, 'w') as f:
+            json.dump({'repeats': repeats, 'results': results}, f, indent=2)
+
+    if baseline_file is not None:
+        with open(baseline_file) as f:
+            baseline = json.load(f)['results']
+        slower = regressions(results, baseline, tolerance)
+        print()
+        for mode, size, before, after in slower:
+            print(f'REGRESJA {mode} {size/1e6:g} MB: {before:.2f} -> {after:.2f} MB/s '
+                  f'({(1 - after/before)*100:.0f}% wolniej, dopuszczalne {tolerance:g}%)')
+        if slower:
+            sys.exit(1)
+        print(f'Brak regresji (tolerancja {tolerance:g}%)')
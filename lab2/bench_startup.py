@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from time import perf_counter
+
+LAB2 = os.path.dirname(os.path.abspath(__file__))
+TXTS = os.path.join(LAB2, '..', 'txts')
+
+# dopuszczalny czas (ms) "import lab2" według python -X importtime
+IMPORT_BUDGET_MS = 25.0
+
+# moduły, których samo "import lab2" nie może wczytywać (wczytywane leniwie)
+LAZY_MODULES = ('numpy', 'multiprocessing', 'unidecode', 'json', 'csv', 'common.cache',
+                'common.keys', 'common.vigenere')
+
+def environment():
+    """
+    Returns environment of measured processes: bytecode is cached, so
+    (after the first run) time of compiling sources is not measured.
+    Returns:
+        environment variables (dict)
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+def import_times(module='lab2'):
+    """
+    Measures importing a module in a fresh interpreter with
+    python -X importtime.
+    Parameters:
+        module (string) - imported module (from the lab2 directory)
+    Returns:
+        dict: module name -> (self time, cumulative time) in milliseconds,
+        in import order
+    Raises:
+        RuntimeError: import failed
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=LAB2,
+                             env=environment(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if self_us.strip().isdigit():
+            times[name.strip()] = (int(self_us)/1000, int(cumulative_us)/1000)
+
+    return times
+
+def command_time(args, repeats=5):
+    """
+    Measures wall time of running python with given arguments (from the
+    lab2 directory, stdin closed, output discarded).
+    Parameters:
+        args (list of strings) - python arguments
+        repeats (int) - number of runs, the shortest time is kept
+    Returns:
+        time in milliseconds (float)
+    Raises:
+        RuntimeError: command failed
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        time_0 = perf_counter()
+        process = subprocess.run([sys.executable] + args, cwd=LAB2, env=environment(),
+                                 stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, perf_counter() - time_0)
+        if process.returncode != 0:
+            raise RuntimeError(' '.join(args))
+
+    return best*1000
+
+def commands(tmp):
+    """
+    Returns measured lab2 invocations.
+    Parameters:
+        tmp (string) - directory for output files
+    Returns:
+        list of (name, python arguments)
+    """
+    return [('python', ['-c', 'pass']),
+            ('import lab2', ['-c', 'import lab2']),
+            ('lab2.py -h', ['lab2.py', '-h']),
+            ('lab2.py --permgen', ['lab2.py', '--permgen', '-o', os.path.join(tmp, 'perm.txt')]),
+            ('lab2.py --keygen', ['lab2.py', '--keygen', '-o', os.path.join(tmp, 'key.txt'), '-l', '16']),
+            ('lab2.py encrypt_cesar', ['lab2.py', '-f', os.path.join(TXTS, 'lab1_example.txt'),
+                                       '-o', os.path.join(tmp, 'out.txt'), '-m', 'encrypt_cesar']),
+            ('lab2.py encrypt_viganere', ['lab2.py', '-f', os.path.join(TXTS, 'lab1_example.txt'),
+                                          '-o', os.path.join(tmp, 'out.txt'), '-m', 'encrypt_viganere',
+                                          '-k', os.path.join(TXTS, 'key.txt')])]
+
+if __name__ == '__main__':
+    repeats = 5
+    budget = IMPORT_BUDGET_MS
+    top = 10
+    json_file = None
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--repeats' and i + 1 < len(sys.argv):
+            repeats = int(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] == '--budget' and i + 1 < len(sys.argv):
+            budget = float(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] == '--top' and i + 1 < len(sys.argv):
+            top = int(sys.argv[i+1])
+            i += 1
+        elif sys.argv[i] == '--json' and i + 1 < len(sys.argv):
+            json_file = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] in ('-h', '--help'):
+            print('Użycie:')
+            print('./bench_startup.py [--repeats <n>] [--budget <ms>] [--top <n>] [--json <plik wynikowy>]')
+            sys.exit()
+        i += 1
+
+    try:
+        # pierwsze uruchomienie zapisuje skompilowane moduły (__pycache__)
+        import_times()
+        runs = [import_times() for _ in range(repeats)]
+        with tempfile.TemporaryDirectory() as tmp:
+            results = [{'command': name, 'ms': command_time(args, repeats)} for name, args in commands(tmp)]
+    except Exception as e:
+        print(f'Wystąpił błąd: {e}')
+        sys.exit(1)
+
+    # najkrótszy z pomiarów importu i czasy modułów z tego pomiaru
+    times = min(runs, key=lambda run: run['lab2'][1])
+    total = times['lab2'][1]
+    loaded = [name for name in LAZY_MODULES if name in times]
+
+    print(f'{"uruchomienie [ms]":<28}{"czas":>10}')
+    for result in results:
+        print(f'{result["command"]:<28}{result["ms"]:>10.1f}')
+    print()
+    print(f'import lab2: {total:.1f} ms (budżet {budget:g} ms), najcięższe moduły:')
+    for name, (self_ms, cumulative_ms) in sorted(times.items(), key=lambda item: -item[1][1])[:top]:
+        print(f'  {name:<32}{cumulative_ms:>8.1f} ms (własny {self_ms:.1f} ms)')
+
+    if json_file is not None:
+        with open(json_file, 'w') as f:
+            json.dump({'repeats': repeats, 'budget_ms': budget, 'import_ms': total,
+                       'modules': {name: {'self_ms': self_ms, 'cumulative_ms': cumulative_ms}
+                                   for name, (self_ms, cumulative_ms) in times.items()},
+                       'results': results}, f, indent=2)
+
+    print()
+    for name in loaded:
+        print(f'REGRESJA: import lab2 wczytuje {name}')
+    if total > budget:
+        print(f'REGRESJA: import lab2 trwa {total:.1f} ms, budżet {budget:g} ms')
+    if loaded or total > budget:
+        sys.exit(1)
+    print('Start w budżecie')
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+from time import perf_counter
+from string import ascii_lowercase
+
+import lab2
+
+# wcześniejsze wersje szyfrów (budowanie wyniku znak po znaku) - punkt odniesienia
+# dla tablic (str.translate) i wektorowego Viganere (numpy)
+def loop_atbasz(plaintext, *args):
+    ciphertext = ''
+    for a in plaintext:
+        ciphertext += chr(25 - (ord(a) - ord('a')) + ord('a'))
+    return ciphertext
+
+def loop_rot13(plaintext, *args):
+    ciphertext = ''
+    for a in plaintext:
+        ciphertext += chr((ord(a) - ord('a') + 13)%26 + ord('a'))
+    return ciphertext
+
+def loop_encrypt_cesar(plaintext, *args):
+    ciphertext = ''
+    for a in plaintext:
+        ciphertext += chr((ord(a) - ord('a') + 3)%26 + ord('a'))
+    return ciphertext
+
+def loop_decrypt_cesar(ciphertext, *args):
+    plaintext = ''
+    for a in ciphertext:
+        plaintext += chr((ord(a) - ord('a') - 3)%26 + ord('a'))
+    return plaintext
+
+def loop_gaderypoluki(plaintext, *args):
+    ciphertext = ''
+    pairs = ('ga', 'de', 'ry', 'po', 'lu', 'ki')
+    for a in plaintext:
+        for pair in pairs:
+            if a in pair:
+                ciphertext += pair[a == pair[0]]
+                break
+        else:
+            ciphertext += a
+    return ciphertext
+
+def loop_encrypt_permutation(plaintext, perm, *args):
+    ciphertext = ''
+    for a in plaintext:
+        ciphertext += perm[ord(a) - ord('a')]
+    return ciphertext
+
+def loop_decrypt_permutation(ciphertext, perm, *args):
+    plaintext = ''
+    q = list(zip(*sorted(list(zip(list(perm), list(ascii_lowercase))))))
+    inv_perm = ''.join(q[1])
+    for a in ciphertext:
+        plaintext += inv_perm[ord(a) - ord('a')]
+    return plaintext
+
+def loop_encrypt_viganere(plaintext, key, *args):
+    ciphertext = ''
+    for i in range(len(plaintext)):
+        ciphertext += chr(((ord(plaintext[i]) - ord('a')) + (ord(key[i%len(key)]) - ord('a')))%26 + ord('a'))
+    return ciphertext
+
+def loop_decrypt_viganere(plaintext, key, *args):
+    ciphertext = ''
+    for i in range(len(plaintext)):
+        ciphertext += chr(((ord(plaintext[i]) - ord('a')) - (ord(key[i%len(key)]) - ord('a')))%26 + ord('a'))
+    return ciphertext
+
+CIPHERS = (
+    ('encrypt_atbasz', loop_atbasz, lab2.encrypt_atbasz),
+    ('encrypt_rot13', loop_rot13, lab2.encrypt_rot13),
+    ('encrypt_cesar', loop_encrypt_cesar, lab2.encrypt_cesar),
+    ('decrypt_cesar', loop_decrypt_cesar, lab2.decrypt_cesar),
+    ('encrypt_gaderypoluki', loop_gaderypoluki, lab2.encrypt_gaderypoluki),
+    ('encrypt_permutation', loop_encrypt_permutation, lab2.encrypt_permutation),
+    ('decrypt_permutation', loop_decrypt_permutation, lab2.decrypt_permutation),
+    ('encrypt_viganere', loop_encrypt_viganere, lab2.encrypt_viganere),
+    ('decrypt_viganere', loop_decrypt_viganere, lab2.decrypt_viganere),
+)
+
+def best_time(func, *args, repeats=3):
+    """
+    Measures function.
+    Parameters:
+        func (function) - measured function
+        args - function arguments
+        repeats (int) - number of measurements
+    Returns:
+        result of func, shortest time in seconds (float)
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        time_0 = perf_counter()
+        result = func(*args)
+        best = min(best, perf_counter() - time_0)
+
+    return result, best
+
+if __name__ == '__main__':
+    txts = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'txts')
+    input_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(txts, 'rand1Mchars.txt')
+    perm = lab2.open_file(os.path.join(txts, 'perm_2.txt'))
+    key = lab2.open_file(os.path.join(txts, 'key.txt'))
+
+    plaintext = lab2.clean_file(input_file, False, True, True)
+    size = len(plaintext)/1e6
+    print(f'Plik {input_file}, po oczyszczeniu {size:.2f} MB')
+    print(f'{"tryb":<24}{"pętla [MB/s]":>14}{"nowa [MB/s]":>16}{"przyspieszenie":>16}')
+    for name, loop, table in CIPHERS:
+        k = key if 'viganere' in name else perm
+        expected, time_loop = best_time(loop, plaintext, k, repeats=1)
+        result, time_table = best_time(table, plaintext, k)
+        print(f'{name:<24}{size/time_loop:>14.2f}{size/time_table:>16.2f}{time_loop/time_table:>15.0f}x'
+              f'{"" if result == expected else "  RÓŻNE WYNIKI"}')
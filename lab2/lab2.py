@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import re
+import os
 import sys
 import io
-import unidecode as ud
-from random import choice, shuffle
-from string import ascii_lowercase
+from abc import ABC, abstractmethod
+from math import gcd
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.lazy import lazy_import
+from common.normalize import clean_text, clean_num, clean_acc, normalize, clean_file, shard_ranges, ascii_clean_table
+
+# ciężkie moduły wczytywane dopiero przy pierwszym użyciu (szybki start CLI)
+np = lazy_import('numpy')
+csv = lazy_import('csv')
+json = lazy_import('json')
+multiprocessing = lazy_import('multiprocessing')
+string = lazy_import('string')
+cache = lazy_import('common.cache')
+keys = lazy_import('common.keys')
+vigenere = lazy_import('common.vigenere')
 
 def open_file(filename):
     """
@@ -25,62 +39,18 @@ def open_file(filename):
 
     return content
 
-def clean_text(plaintext, keep_spaces=False):
+def clean(plaintext):
     """
-    Clears whitespace from file content.
+    Clears whitespace, numbers and diacritics from file content
+    and changes letters to lowercase.
     Parameters:
         plaintext (string) - file content
-	    keep_spaces (bool) - if whitespace are kept
     Returns:
         prodessed plaintext (string)
     Raises:
-         TypeError: filename is not a string
-    """
-
-    if type(plaintext) != str:
-        raise TypeError
-
-    if keep_spaces:
-        pattern = r'[^a-zA-Zą-źĄ-Ź0-9 ]+'
-    else:
-        pattern = r'[^a-zA-Zą-źĄ-Ź0-9]+'
-
-    return re.sub(pattern, '', plaintext)
-
-def clean_num(plaintext):
-    """
-    Clears numbers from file content
-    Parameters:
-         plaintext (string) - file content
-    Returns:
-         prodessed plaintext (string)
-    Raises:
-        TypeError: filename is not a string
-    """
-    if type(plaintext) != str:
-        raise TypeError
-
-    return re.sub(r'[0-9]+', '', plaintext)
-
-def clean_acc(plaintext, lower=True):
-    """
-    Changes uppercase letters to lowercase letters in file content.
-    Clears diacritics from file content.
-    Parameters:
-         plaintext (string) - file content
-	     lower (bool) - if uppercase letters are kept
-    Returns:
-         prodessed plaintext (string)
-    Raises:
-         TypeError: filename is not a string
+        TypeError: plaintext is not a string
     """
-    if type(plaintext) != str:
-        raise TypeError
-
-    if lower:
-        plaintext = plaintext.lower()
-
-    return ud.unidecode(plaintext)
+    return normalize(plaintext, False, True, True)
 
 def col_text(plaintext):
     """
@@ -119,6 +89,68 @@ def write_to_file(plaintext, filename):
     with open(filename, 'w') as f:
         f.write(plaintext)
 
+# ================ tablice
+A = ord('a')
+
+def formula_table(formula, codes=range(128)):
+    """
+    Builds str.translate table from formula working on character codes.
+    Parameters:
+        formula (function) - returns new character for a code or None
+                             if character should stay unchanged
+        codes (iterable) - codes of translated characters
+    Returns:
+        translation table (dict)
+    """
+    table = {}
+    for code in codes:
+        c = formula(code)
+        if c is not None:
+            table[code] = c
+
+    return table
+
+# tablice liczone tymi samymi wzorami co wcześniejsze pętle po znakach
+# (dla tekstu ASCII wynik jest taki sam)
+ATBASZ_TABLE = formula_table(lambda code: chr(25 - (code - ord('a')) + ord('a')))
+ROT13_TABLE = formula_table(lambda code: chr((code - ord('a') + 13)%26 + ord('a')))
+CESAR_ENCRYPT_TABLE = formula_table(lambda code: chr((code - ord('a') + 3)%26 + ord('a')))
+CESAR_DECRYPT_TABLE = formula_table(lambda code: chr((code - ord('a') - 3)%26 + ord('a')))
+GADERYPOLUKI_TABLE = str.maketrans('gaderypoluki', 'agedyropulik')
+
+def permutation_table(perm, inverse=False):
+    """
+    Builds translation table of given permutation or its inverse. Tables
+    are not cached (there can be millions of keys).
+    Parameters:
+        perm (string) - permutation string
+        inverse (bool) - if table of the inverse permutation is built
+    Returns:
+        translation table (dict)
+    """
+    if inverse:
+        # obliczanie permutacji odwrotnej
+        q = list(zip(*sorted(list(zip(list(perm), list(string.ascii_lowercase))))))
+        perm = ''.join(q[1])
+
+    # indeksy ujemne jak przy perm[ord(a) - ord('a')]
+    def index(code):
+        i = code - ord('a')
+        return i if -len(perm) <= i < len(perm) else None
+
+    return formula_table(lambda code: None if index(code) is None else perm[index(code)])
+
+def permutation_tables(perm):
+    """
+    Builds translation tables for both directions of given permutation,
+    Permutation cipher builds them once per object.
+    Parameters:
+        perm (string) - permutation string
+    Returns:
+        encryption table (dict), decryption table (dict)
+    """
+    return permutation_table(perm), permutation_table(perm, True)
+
 # ================ atbasz
 def encrypt_atbasz(plaintext, *args, **kwargs):
     """
@@ -133,12 +165,7 @@ def encrypt_atbasz(plaintext, *args, **kwargs):
     if type(plaintext) != str:
         raise TypeError
 
-    ciphertext = ''
-
-    for a in plaintext:
-        ciphertext += chr(25 - (ord(a) - ord('a')) + ord('a'))
-
-    return ciphertext
+    return plaintext.translate(ATBASZ_TABLE)
 
 decrypt_atbasz = encrypt_atbasz
 
@@ -156,12 +183,7 @@ def encrypt_rot13(plaintext, *args, **kwargs):
     if type(plaintext) != str:
         raise TypeError
 
-    ciphertext = ''
-
-    for a in plaintext:
-        ciphertext += chr((ord(a) - ord('a') + 13)%26 + ord('a'))
-
-    return ciphertext
+    return plaintext.translate(ROT13_TABLE)
 
 decrypt_rot13 = encrypt_rot13
 
@@ -179,12 +201,7 @@ def encrypt_cesar(plaintext, *args, **kwargs):
     if type(plaintext) != str:
         raise TypeError
 
-    ciphertext = ''
-
-    for a in plaintext:
-        ciphertext += chr((ord(a) - ord('a') + 3)%26 + ord('a'))
-
-    return ciphertext
+    return plaintext.translate(CESAR_ENCRYPT_TABLE)
 
 def decrypt_cesar(ciphertext, *args, **kwargs):
     """
@@ -199,12 +216,7 @@ def decrypt_cesar(ciphertext, *args, **kwargs):
     if type(ciphertext) != str:
         raise TypeError
 
-    plaintext = ''
-
-    for a in ciphertext:
-        plaintext += chr((ord(a) - ord('a') - 3)%26 + ord('a'))
-
-    return plaintext
+    return ciphertext.translate(CESAR_DECRYPT_TABLE)
 
 # ================ gaderypoluki
 def encrypt_gaderypoluki(plaintext, *args, **kwargs):
@@ -220,22 +232,21 @@ def encrypt_gaderypoluki(plaintext, *args, **kwargs):
     if type(plaintext) != str:
         raise TypeError
 
-    ciphertext = ''
-    pairs = ('ga', 'de', 'ry', 'po', 'lu', 'ki')
-
-    for a in plaintext:
-        for pair in pairs:
-            if a in pair:
-                ciphertext += pair[a == pair[0]]
-                break
-        else:
-            ciphertext += a
-
-    return ciphertext
+    return plaintext.translate(GADERYPOLUKI_TABLE)
 
 decrypt_gaderypoluki = encrypt_gaderypoluki
 
 # ================ permutation
+def is_valid_permutation(perm):
+    """
+    Checks if key is a permutation of the alphabet.
+    Parameters:
+        perm (string) - permutation string
+    Returns:
+        (bool)
+    """
+    return len(perm) == 26 and ''.join(sorted(list(perm))) == string.ascii_lowercase
+
 def encrypt_permutation(plaintext, perm, *args, **kwargs):
     """
     Encrypts plaintext using permutation algorithm.
@@ -250,12 +261,7 @@ def encrypt_permutation(plaintext, perm, *args, **kwargs):
     if type(plaintext) != str:
         raise TypeError
 
-    ciphertext = ''
-
-    for a in plaintext:
-        ciphertext += perm[ord(a) - ord('a')]
-
-    return ciphertext
+    return plaintext.translate(permutation_table(perm))
 
 def decrypt_permutation(ciphertext, perm, *args, **kwargs):
     """
@@ -271,16 +277,7 @@ def decrypt_permutation(ciphertext, perm, *args, **kwargs):
     if type(ciphertext) != str:
         raise TypeError
 
-    plaintext = ''
-
-    # obliczanie permutacji odwrotnej
-    q = list(zip(*sorted(list(zip(list(perm), list(ascii_lowercase))))))
-    inv_perm = ''.join(q[1])
-
-    for a in ciphertext:
-        plaintext += inv_perm[ord(a) - ord('a')]
-
-    return plaintext
+    return ciphertext.translate(permutation_table(perm, True))
 
 # ================ viganere
 def encrypt_viganere(plaintext, key, *args, **kwargs):
@@ -295,14 +292,9 @@ def encrypt_viganere(plaintext, key, *args, **kwargs):
         TypeError: plaintext is not a string
     """
     if type(plaintext) != str:
-        return TypeError
-
-    ciphertext = ''
-
-    for i in range(len(plaintext)):
-        ciphertext += chr(((ord(plaintext[i]) - ord('a')) + (ord(key[i%len(key)]) - ord('a')))%26 + ord('a'))
+        raise TypeError
 
-    return ciphertext
+    return vigenere.encrypt(plaintext, key)
 
 def decrypt_viganere(plaintext, key, *args, **kwargs):
     """
@@ -318,12 +310,739 @@ def decrypt_viganere(plaintext, key, *args, **kwargs):
     if type(plaintext) != str:
         raise TypeError
 
-    ciphertext = ''
+    return vigenere.decrypt(plaintext, key)
 
-    for i in range(len(plaintext)):
-        ciphertext += chr(((ord(plaintext[i]) - ord('a')) - (ord(key[i%len(key)]) - ord('a')))%26 + ord('a'))
+# ================ rejestr szyfrów
+# rozmiar fragmentu (w bajtach) tłumaczonego naraz (indeksy np.take mają 8 bajtów)
+BYTES_CHUNK = 1 << 16
 
-    return ciphertext
+def byte_table(table):
+    """
+    Converts str.translate table of single characters to bytes.translate table.
+    Parameters:
+        table (dict) - str.translate table
+    Returns:
+        translation table (bytes)
+    """
+    codes = bytearray(range(256))
+    for code, c in table.items():
+        if code < 256:
+            codes[code] = c if type(c) == int else ord(c)
+
+    return bytes(codes)
+
+def byte_views(data, out=None):
+    """
+    Returns flat byte views of input and output buffers (without copying).
+    Parameters:
+        data (bytes-like) - input buffer (bytes, bytearray, memoryview, mmap...)
+        out (writable bytes-like) - output buffer of the same size (default: data)
+    Returns:
+        input view (memoryview), output view (memoryview)
+    Raises:
+        TypeError: data/out is not a contiguous bytes-like object or output is read-only
+        ValueError: out has different size than data
+    """
+    src = memoryview(data).cast('B')
+    dst = src if out is None else memoryview(out).cast('B')
+    if dst.readonly:
+        raise TypeError
+    if dst.nbytes != src.nbytes:
+        raise ValueError
+
+    return src, dst
+
+class Cipher(ABC):
+    """
+    Cipher built once from its key. Key is validated and everything that
+    depends only on it (tables, inverse permutation, key residues) is
+    computed in the constructor, so encrypt and decrypt can be called
+    for many texts without repeating that work. Subclasses implement
+    the abstract methods.
+    """
+    key_required = False
+
+    def __init__(self, key=None):
+        pass
+
+    @abstractmethod
+    def encrypt(self, plaintext, phase=0):
+        """
+        Encrypts plaintext.
+        Parameters:
+            plaintext (string) - text
+            phase (int) - position of the first character in the whole
+                          text (matters only for polyalphabetic ciphers)
+        Returns:
+            ciphered text (string)
+        Raises:
+            TypeError: plaintext is not a string
+        """
+
+    @abstractmethod
+    def decrypt(self, ciphertext, phase=0):
+        """
+        Decrypts ciphertext.
+        Parameters:
+            ciphertext (string) - text
+            phase (int) - position of the first character in the whole
+                          text (matters only for polyalphabetic ciphers)
+        Returns:
+            decrypted text (string)
+        Raises:
+            TypeError: ciphertext is not a string
+        """
+
+    def encrypt_bytes(self, data, phase=0):
+        """
+        Encrypts ASCII text given as bytes, every byte is one character.
+        Parameters:
+            data (bytes-like) - bytes, bytearray, memoryview, mmap...
+            phase (int) - position of the first character in the whole text
+        Returns:
+            ciphered text (bytes or bytearray, built in one buffer without
+            intermediate copies)
+        Raises:
+            TypeError: data is not a contiguous bytes-like object
+        """
+        return self.transform_bytes(data, 1, phase)
+
+    def decrypt_bytes(self, data, phase=0):
+        """
+        Decrypts ASCII text given as bytes, every byte is one character.
+        Parameters:
+            data (bytes-like) - bytes, bytearray, memoryview, mmap...
+            phase (int) - position of the first character in the whole text
+        Returns:
+            decrypted text (bytes or bytearray, built in one buffer without
+            intermediate copies)
+        Raises:
+            TypeError: data is not a contiguous bytes-like object
+        """
+        return self.transform_bytes(data, -1, phase)
+
+    def encrypt_into(self, data, out=None, phase=0):
+        """
+        Encrypts ASCII text given as bytes, writing the result into a buffer
+        without intermediate copies.
+        Parameters:
+            data (bytes-like) - bytes, bytearray, memoryview, mmap...
+            out (writable bytes-like) - buffer of the same size for the result
+                                        (default: data, encrypted in place)
+            phase (int) - position of the first character in the whole text
+        Returns:
+            out (or data)
+        Raises:
+            TypeError: data/out is not a contiguous bytes-like object or output is read-only
+            ValueError: out has different size than data
+        """
+        return self.transform_into(data, out, 1, phase)
+
+    def decrypt_into(self, data, out=None, phase=0):
+        """
+        Decrypts ASCII text given as bytes, writing the result into a buffer
+        without intermediate copies.
+        Parameters:
+            data (bytes-like) - bytes, bytearray, memoryview, mmap...
+            out (writable bytes-like) - buffer of the same size for the result
+                                        (default: data, decrypted in place)
+            phase (int) - position of the first character in the whole text
+        Returns:
+            out (or data)
+        Raises:
+            TypeError: data/out is not a contiguous bytes-like object or output is read-only
+            ValueError: out has different size than data
+        """
+        return self.transform_into(data, out, -1, phase)
+
+    @abstractmethod
+    def transform_bytes(self, data, sign, phase=0):
+        """
+        Implements encrypt_bytes (sign 1) and decrypt_bytes (sign -1).
+        """
+
+    @abstractmethod
+    def transform_into(self, data, out, sign, phase=0):
+        """
+        Implements encrypt_into (sign 1) and decrypt_into (sign -1).
+        """
+
+    @abstractmethod
+    def residue_table(self, sign):
+        """
+        Returns the cipher as a periodic substitution of letters a-z:
+        letter x at position i is replaced with table[i % period, x].
+        The table describes only letters a-z, other characters are mapped
+        as the cipher maps them (e.g. Viganere shifts them into letters).
+        Parameters:
+            sign (int) - 1 for encryption, -1 for decryption
+        Returns:
+            table of letter numbers (numpy.ndarray of uint8, shape (period, 26))
+        """
+
+class TableCipher(Cipher):
+    """
+    Cipher replacing single characters using str.translate tables
+    (and bytes.translate tables built from them).
+    """
+    def __init__(self, encrypt_table, decrypt_table):
+        self.encrypt_table = encrypt_table
+        self.decrypt_table = decrypt_table
+        self.byte_tables = {1: byte_table(encrypt_table), -1: byte_table(decrypt_table)}
+
+    def encrypt(self, plaintext, phase=0):
+        if type(plaintext) != str:
+            raise TypeError
+
+        return plaintext.translate(self.encrypt_table)
+
+    def decrypt(self, ciphertext, phase=0):
+        if type(ciphertext) != str:
+            raise TypeError
+
+        return ciphertext.translate(self.decrypt_table)
+
+    def transform_bytes(self, data, sign, phase=0):
+        table = self.byte_tables[sign]
+        if type(data) == bytes:
+            return data.translate(table)
+
+        src = memoryview(data).cast('B')
+        return self.transform_into(src, bytearray(len(src)), sign, phase)
+
+    def transform_into(self, data, out, sign, phase=0):
+        src, dst = byte_views(data, out)
+        table = np.frombuffer(self.byte_tables[sign], np.uint8)
+        codes = np.frombuffer(src, np.uint8)
+        result = np.frombuffer(dst, np.uint8)
+        # fragmentami - np.take zamienia indeksy na intp (8 razy więcej pamięci)
+        for i in range(0, len(codes), BYTES_CHUNK):
+            np.take(table, codes[i:i+BYTES_CHUNK], out=result[i:i+BYTES_CHUNK], mode='clip')
+
+        return data if out is None else out
+
+    def residue_table(self, sign):
+        table = np.frombuffer(self.byte_tables[sign], np.uint8)[A:A+26] - np.uint8(A)
+        if table.max() >= 26:
+            raise ValueError
+
+        return table.reshape(1, 26)
+
+class Atbasz(TableCipher):
+    def __init__(self, key=None):
+        super().__init__(ATBASZ_TABLE, ATBASZ_TABLE)
+
+class Rot13(TableCipher):
+    def __init__(self, key=None):
+        super().__init__(ROT13_TABLE, ROT13_TABLE)
+
+class Cesar(TableCipher):
+    def __init__(self, key=None):
+        super().__init__(CESAR_ENCRYPT_TABLE, CESAR_DECRYPT_TABLE)
+
+class Gaderypoluki(TableCipher):
+    def __init__(self, key=None):
+        super().__init__(GADERYPOLUKI_TABLE, GADERYPOLUKI_TABLE)
+
+class Permutation(TableCipher):
+    """
+    Permutation cipher, key is a permutation of the alphabet.
+    Raises:
+        TypeError: key is not a string
+        ValueError: key is not a permutation of the alphabet
+    """
+    key_required = True
+
+    def __init__(self, key=None):
+        if type(key) != str:
+            raise TypeError
+        if not is_valid_permutation(key):
+            raise ValueError
+
+        self.key = key
+        super().__init__(*permutation_tables(key))
+
+# długość bloku tekstu szyfrowanego naraz szyfrem Viganere (i powielonego klucza)
+VIGANERE_BLOCK = 1 << 20
+
+class Viganere(Cipher):
+    """
+    Viganere cipher. Key residues for both directions are computed once
+    and tiled to a block of fixed length (a multiple of the key length),
+    text is shifted block by block, so memory kept by the cipher does not
+    depend on the length of texts.
+    Raises:
+        TypeError: key is not a string
+        ValueError: key is empty
+    """
+    key_required = True
+
+    def __init__(self, key=None):
+        residues_by_sign = {1: vigenere.key_residues(key, 1), -1: vigenere.key_residues(key, -1)}
+        self.key = key
+        self.block = len(key)*max(VIGANERE_BLOCK//len(key), 1)
+        # blok klucza i jeszcze jeden klucz na przesunięcie fazy
+        self.keys = {sign: vigenere.tile(res, self.block + len(key))[:self.block + len(key)]
+                     for sign, res in residues_by_sign.items()}
+
+    def key_blocks(self, sign, length, phase=0):
+        """
+        Splits text of given length into blocks. Every block starts at
+        the same key letter, so all of them share one array of key residues.
+        Parameters:
+            sign (int) - 1 to encrypt, -1 to decrypt
+            length (int) - text length
+            phase (int) - index of key letter used for the first character
+        Returns:
+            generator of (start, end, key residues of the block)
+        """
+        start = phase%len(self.key)
+        key_res = self.keys[sign][start:start+self.block]
+        for i in range(0, length, self.block):
+            yield i, min(i + self.block, length), key_res
+
+    def shift(self, text, sign, phase=0):
+        if type(text) != str:
+            raise TypeError
+
+        text_res = vigenere.residues(text)
+        for start, end, key_res in self.key_blocks(sign, len(text_res), phase):
+            vigenere.shift_residues(text_res[start:end], key_res)
+
+        return text_res.tobytes().decode('ascii')
+
+    def encrypt(self, plaintext, phase=0):
+        return self.shift(plaintext, 1, phase)
+
+    def decrypt(self, ciphertext, phase=0):
+        return self.shift(ciphertext, -1, phase)
+
+    def transform_bytes(self, data, sign, phase=0):
+        src = memoryview(data).cast('B')
+        return self.transform_into(src, bytearray(len(src)), sign, phase)
+
+    def transform_into(self, data, out, sign, phase=0):
+        src, dst = byte_views(data, out)
+        for start, end, key_res in self.key_blocks(sign, len(src), phase):
+            vigenere.shift_buffer(src[start:end], dst[start:end], key_res)
+
+        return data if out is None else out
+
+    def residue_table(self, sign):
+        key_res = self.keys[sign][:len(self.key)]
+        return ((np.arange(26) + key_res[:, None].astype(np.int64)) % 26).astype(np.uint8)
+
+class PeriodicSubstitution(Cipher):
+    """
+    Letter a-z at position i of text is replaced using row i % period of
+    a table (see Cipher.residue_table), other characters are left unchanged.
+    Result of compiling a cascade of ciphers that is neither a single
+    substitution nor Viganere cipher.
+    """
+    def __init__(self, table):
+        table = np.asarray(table, np.uint8)
+        self.tables = {1: table, -1: np.argsort(table, axis=1).astype(np.uint8)}
+
+    def substitute(self, codes, sign, phase=0, out=None):
+        """
+        Substitutes letters of text given as character codes.
+        Parameters:
+            codes (numpy.ndarray) - character codes (uint8 or uint32)
+            sign (int) - 1 to encrypt, -1 to decrypt
+            phase (int) - position of the first character in the whole text
+            out (numpy.ndarray) - writable array for the result (default: codes)
+        Returns:
+            out
+        """
+        if out is None:
+            out = codes
+        table = self.tables[sign]
+        flat = (table + np.uint8(A)).ravel()
+        period = len(table)
+
+        if len(codes) and codes.min() >= A and codes.max() < A + 26:
+            # same litery - blokami o długości będącej wielokrotnością okresu,
+            # przesunięcia wierszy tablicy liczone raz dla bloku
+            block = period*max(BYTES_CHUNK//period, 1)
+            start = phase%period
+            offsets = np.arange(start, start + block) % period*26 - A
+            for i in range(0, len(codes), block):
+                part = codes[i:i+block]
+                np.take(flat, offsets[:len(part)] + part, out=out[i:i+block])
+        else:
+            positions = np.flatnonzero((codes >= A) & (codes < A + 26))
+            letters = codes[positions].astype(np.int64) - A
+            if out is not codes:
+                out[:] = codes
+            out[positions] = flat[(positions + phase) % period*26 + letters]
+
+        return out
+
+    def shift(self, text, sign, phase=0):
+        if type(text) != str:
+            raise TypeError
+
+        if text.isascii():
+            codes = np.frombuffer(text.encode('ascii'), np.uint8).copy()
+            return self.substitute(codes, sign, phase).tobytes().decode('ascii')
+
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), np.uint32).copy()
+        return self.substitute(codes, sign, phase).tobytes().decode('utf-32-le', 'surrogatepass')
+
+    def encrypt(self, plaintext, phase=0):
+        return self.shift(plaintext, 1, phase)
+
+    def decrypt(self, ciphertext, phase=0):
+        return self.shift(ciphertext, -1, phase)
+
+    def transform_bytes(self, data, sign, phase=0):
+        src = memoryview(data).cast('B')
+        return self.transform_into(src, bytearray(len(src)), sign, phase)
+
+    def transform_into(self, data, out, sign, phase=0):
+        src, dst = byte_views(data, out)
+        self.substitute(np.frombuffer(src, np.uint8), sign, phase, np.frombuffer(dst, np.uint8))
+
+        return data if out is None else out
+
+    def residue_table(self, sign):
+        return self.tables[sign]
+
+# szyfry dostępne w trybach <encrypt|decrypt>_<nazwa>
+CIPHERS = {'atbasz': Atbasz,
+           'viganere': Viganere,
+           'rot13': Rot13,
+           'cesar': Cesar,
+           'permutation': Permutation,
+           'gaderypoluki': Gaderypoluki}
+
+def build_cipher(mode, key=None):
+    """
+    Builds cipher object for given mode.
+    Parameters:
+        mode (string) - one of available_mode
+        key (string) - cipher key (if mode requires it)
+    Returns:
+        cipher (Cipher), direction of the mode (int, 1 to encrypt, -1 to decrypt)
+    Raises:
+        TypeError: required key is not a string
+        ValueError: mode is not available or key is invalid
+    """
+    if mode not in available_mode:
+        raise ValueError
+
+    direction, name = mode.split('_', 1)
+    return CIPHERS[name](key), 1 if direction == 'encrypt' else -1
+
+def get_cipher(mode, key=None):
+    """
+    Builds cipher for given mode and returns its encrypt or decrypt method.
+    The returned function can be called for many texts.
+    Parameters:
+        mode (string) - one of available_mode
+        key (string) - cipher key (if mode requires it)
+    Returns:
+        (function) taking text (and optionally phase), returning result (string)
+    Raises:
+        TypeError: required key is not a string
+        ValueError: mode is not available or key is invalid
+    """
+    cipher, sign = build_cipher(mode, key)
+    return cipher.encrypt if sign == 1 else cipher.decrypt
+
+# ================ kaskada
+def minimal_period(table):
+    """
+    Shortens periodic substitution table to its shortest period.
+    Parameters:
+        table (numpy.ndarray) - table of shape (period, 26)
+    Returns:
+        table of the shortest period (numpy.ndarray)
+    """
+    period = len(table)
+    for p in range(1, period + 1):
+        if period % p == 0 and (table == table[np.arange(period) % p]).all():
+            return table[:p]
+
+def compile_cascade(steps):
+    """
+    Compiles a cascade of ciphers into one equivalent cipher applied in
+    a single pass. Every step is a periodic substitution of letters a-z,
+    two steps of periods p and q compose into one of period lcm(p, q).
+    The result is reduced to its shortest period and returned as
+    a substitution (Permutation) if the period is 1, as Viganere cipher if
+    every row is a shift, or as PeriodicSubstitution otherwise.
+    For text of letters a-z (cleaned text, as given by the program)
+    encrypting with the result gives the same text as applying the steps
+    one after another, decrypting reverses the whole cascade. Other
+    characters are not covered: the steps and the result classes map them
+    differently (Permutation changes codes 'A' - '`', Viganere shifts every
+    character into a letter, PeriodicSubstitution leaves them unchanged),
+    so text should be cleaned first.
+    Parameters:
+        steps (list of tuples) - (mode, key) pairs, mode from available_mode,
+                                 key is None if mode does not need it
+    Returns:
+        compiled cipher (Cipher)
+    Raises:
+        TypeError: required key is not a string
+        ValueError: steps are empty, mode is not available or key is invalid
+    """
+    if not steps:
+        raise ValueError
+
+    table = np.arange(26, dtype=np.uint8).reshape(1, 26)
+    for mode, key in steps:
+        cipher, sign = build_cipher(mode, key)
+        step = cipher.residue_table(sign)
+        period = len(table)*len(step)//gcd(len(table), len(step))
+        rows = np.arange(period)
+        table = np.take_along_axis(step[rows % len(step)], table[rows % len(table)].astype(np.intp), axis=1)
+
+    table = minimal_period(table)
+    if len(table) == 1:
+        return Permutation((table[0] + np.uint8(A)).tobytes().decode('ascii'))
+
+    shifts = table[:, :1]
+    if (table == (np.arange(26) + shifts.astype(np.int64)) % 26).all():
+        return Viganere((shifts.ravel() + np.uint8(A)).tobytes().decode('ascii'))
+
+    return PeriodicSubstitution(table)
+
+# ================ strumień
+def stream_cipher(input_stream, output_stream, mode, key=None, chunk_size=1 << 20):
+    """
+    Cleans and (de)crypts text reading and writing it in chunks, so memory
+    usage does not depend on its size. Viganere key phase is carried
+    across chunks, other ciphers work on single characters.
+    Parameters:
+        input_stream (text file) - source of the text (e.g. sys.stdin)
+        output_stream (text file) - destination of the result (e.g. sys.stdout)
+        mode (string) - one of available_mode
+        key (string) - cipher key (if mode requires it)
+        chunk_size (int) - number of characters read at once
+    Raises:
+        TypeError: required key is not a string
+        ValueError: mode is not available, key is invalid or chunk_size is not positive
+    """
+    if chunk_size <= 0:
+        raise ValueError
+
+    cipher = get_cipher(mode, key)
+    phase = 0
+    for chunk in iter(lambda: input_stream.read(chunk_size), ''):
+        chunk = clean(chunk)
+        output_stream.write(cipher(chunk, phase))
+        phase += len(chunk)
+
+# ================ równolegle
+# docelowy rozmiar fragmentu pliku (w bajtach) przetwarzanego przez jeden proces
+SHARD_SIZE = 16 << 20
+
+def clean_shard(input_file, start, end):
+    """
+    Reads byte range of UTF-8 file and cleans it (see clean). Pure ASCII
+    range is filtered with bytes.translate without decoding, as in clean_file.
+    Parameters:
+        input_file (string) - name of a file
+        start (int) - first byte of the range (beginning of a character)
+        end (int) - end of the range
+    Returns:
+        cleaned text (ASCII bytes)
+    """
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    if data.isascii():
+        return data.translate(*ascii_clean_table(False, True, True))
+
+    return clean(data.decode('utf8')).encode('ascii')
+
+def clean_part(args):
+    """
+    Cleans byte range of the input and saves it in a part file (first pass
+    of parallel_viganere).
+    Parameters:
+        args (tuple) - input_file, start, end, part_file
+    Returns:
+        length of cleaned text (int)
+    """
+    input_file, start, end, part_file = args
+    text = clean_shard(input_file, start, end)
+    with open(part_file, 'wb') as f:
+        f.write(text)
+
+    return len(text)
+
+def shift_part(args):
+    """
+    (De)crypts cleaned part file and writes it at given offset of the output
+    file, then removes the part (second pass of parallel_viganere). Key phase
+    of the part is its offset in the cleaned text.
+    Parameters:
+        args (tuple) - part_file, output_file, offset, key, sign
+    """
+    part_file, output_file, offset, key, sign = args
+    codes = np.fromfile(part_file, np.uint8)
+    vigenere.shift_codes(codes, vigenere.key_residues(key, sign, offset))
+    with open(output_file, 'r+b') as f:
+        f.seek(offset)
+        f.write(codes)
+    os.remove(part_file)
+
+def parallel_viganere(input_file, output_file, key, decrypt=False, jobs=None, shard_size=SHARD_SIZE):
+    """
+    (De)crypts file with viganere algorithm using a pool of processes.
+    Input (UTF-8) is split into shards. In the first pass processes clean
+    the shards into part files, prefix sums of their lengths give offset of
+    every part in the output (and its key phase). In the second pass
+    processes shift the parts and write them at their offsets of
+    a preallocated temporary file, which replaces output_file only if all
+    shards succeeded (so input_file can be the same file as output_file).
+    Parameters:
+        input_file (string) - name of an input file
+        output_file (string) - name of an output file
+        key (string) - cipher key
+        decrypt (bool) - if text is decrypted
+        jobs (int) - number of processes (default: number of CPUs)
+        shard_size (int) - target number of bytes of a shard
+    Raises:
+        TypeError: input_file/output_file/key is not a string
+        ValueError: key is empty, jobs or shard_size is not positive
+    """
+    if type(input_file) != str or type(output_file) != str or type(key) != str:
+        raise TypeError
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if not key or jobs <= 0 or shard_size <= 0:
+        raise ValueError
+
+    shards = shard_ranges(input_file, max(4*jobs, -(-os.path.getsize(input_file)//shard_size)))
+    # pliki tymczasowe obok wyniku (ta sama partycja dla os.replace), osobne dla procesu
+    tmp = f'{output_file}.{os.getpid()}.tmp'
+    parts = [f'{tmp}.{i}' for i in range(len(shards))]
+    try:
+        with multiprocessing.Pool(jobs) as pool:
+            lengths = pool.map(clean_part, [(input_file, start, end, part)
+                                            for (start, end), part in zip(shards, parts)])
+            offsets = [0]
+            for length in lengths:
+                offsets.append(offsets[-1] + length)
+
+            with open(tmp, 'wb') as f:
+                f.truncate(offsets[-1])
+            pool.map(shift_part, [(part, tmp, offset, key, -1 if decrypt else 1)
+                                  for part, offset in zip(parts, offsets)])
+        os.replace(tmp, output_file)
+    except BaseException:
+        for name in parts + [tmp]:
+            if os.path.exists(name):
+                os.remove(name)
+        raise
+
+# ================ zadania
+# pola wiersza pliku zadań (kolejność kolumn w CSV)
+MANIFEST_FIELDS = ('input', 'output', 'mode', 'key')
+
+def read_manifest(filename):
+    """
+    Reads job manifest. Every line is a JSON object with fields input,
+    output, mode and key (name of a key file, optional) or a CSV row with
+    the same fields in this order. Empty lines, lines starting with #
+    and CSV header are skipped.
+    Parameters:
+        filename (string) - name of a manifest file
+    Returns:
+        list of jobs (dicts)
+    Raises:
+        TypeError: filename is not a string
+        ValueError: line does not describe a job
+    """
+    if type(filename) != str:
+        raise TypeError
+
+    jobs = []
+    with io.open(filename, mode='r', encoding='utf8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                job = json.loads(line)
+            else:
+                row = next(csv.reader([line]))
+                if tuple(field.strip() for field in row) == MANIFEST_FIELDS[:len(row)]:
+                    continue
+                job = dict(zip(MANIFEST_FIELDS, (field.strip() for field in row)))
+            if not job.get('input') or not job.get('output') or not job.get('mode'):
+                raise ValueError(f'linia {number}: brak input, output lub mode')
+            job['key'] = job.get('key') or None
+            jobs.append(job)
+
+    return jobs
+
+# klucze i szyfry wczytane przez proces roboczy (wspólne dla jego zadań)
+_job_keys = {}
+_job_ciphers = {}
+
+def job_cipher(mode, key_file):
+    """
+    Returns cipher function for a job. Key files are read and ciphers are
+    built once per process for every (mode, key file) pair.
+    Parameters:
+        mode (string) - one of available_mode
+        key_file (string) - name of a key file (if mode requires it)
+    Returns:
+        (function) see get_cipher
+    Raises:
+        ValueError: mode is not available, key file is missing or key is invalid
+    """
+    if (mode, key_file) not in _job_ciphers:
+        if mode not in available_mode:
+            raise ValueError(f'niedostępny tryb {mode}')
+        key = None
+        if mode in key_required:
+            if key_file is None:
+                raise ValueError('brak pliku z kluczem')
+            if key_file not in _job_keys:
+                _job_keys[key_file] = open_file(key_file)
+            key = _job_keys[key_file]
+        try:
+            _job_ciphers[mode, key_file] = get_cipher(mode, key)
+        except ValueError:
+            raise ValueError(f'błędny klucz {key_file}')
+
+    return _job_ciphers[mode, key_file]
+
+def run_job(job):
+    """
+    Cleans and (de)crypts input file of a job and writes the result.
+    Parameters:
+        job (dict) - input, output, mode and key fields (see read_manifest)
+    Returns:
+        job, error message (string or None), time in seconds (float)
+    """
+    time_0 = perf_counter()
+    try:
+        cipher = job_cipher(job['mode'], job['key'])
+        write_to_file(cipher(clean_file(job['input'], False, True, True)), job['output'])
+    except Exception as e:
+        return job, str(e) or type(e).__name__, perf_counter() - time_0
+
+    return job, None, perf_counter() - time_0
+
+def run_manifest(jobs, processes=None):
+    """
+    Runs jobs in a pool of processes.
+    Parameters:
+        jobs (list of dicts) - jobs (see read_manifest)
+        processes (int) - number of processes (default: number of CPUs)
+    Returns:
+        generator of job results in manifest order (see run_job)
+    """
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap(run_job, jobs)
 
 # ================ keygen
 def keygen(output_file, length):
@@ -342,8 +1061,7 @@ def keygen(output_file, length):
         raise ValueError
 
     with open(output_file, 'w') as file:
-        for _ in range(length):
-            file.write(choice(ascii_lowercase))
+        file.write(keys.random_key(length))
 
 # ================ permgen
 def permgen(output_file):
@@ -358,18 +1076,7 @@ def permgen(output_file):
         raise TypeError
 
     with open(output_file, 'w') as file:
-        p = list(ascii_lowercase)
-        shuffle(p)
-        file.write(''.join(p))
-
-# zmienne globalne
-input_file = None
-output_file = None
-key_file = None
-mode = None
-key_length = 26
-generate_key = False
-generate_perm = False
+        file.write(keys.random_permutation())
 
 available_mode = ('encrypt_atbasz', 'decrypt_atbasz',
                   'encrypt_viganere', 'decrypt_viganere',
@@ -381,182 +1088,302 @@ available_mode = ('encrypt_atbasz', 'decrypt_atbasz',
 key_required = ('encrypt_viganere', 'decrypt_viganere',
                 'encrypt_permutation', 'decrypt_permutation')
 
-easy_mode = False
-
-# odczytywanie argumentów
-i = 0
-while i < len(sys.argv):
-    if sys.argv[i] in ('-f', '--file') and i + 1 < len(sys.argv):
-        input_file = sys.argv[i+1]
-        i += 1
-    if sys.argv[i] in ('-o', '--output') and i + 1 < len(sys.argv):
-        output_file = sys.argv[i+1]
-        i += 1
-    if sys.argv[i] in ('-k', '--key_file') and i + 1 < len(sys.argv):
-        key_file = sys.argv[i+1]
-        i += 1
-    if sys.argv[i] in ('-m', '--mode') and i + 1 < len(sys.argv):
-        mode = sys.argv[i+1]
-        i += 1
-    if sys.argv[i] in ('-l', '--key_length') and i + 1 < len(sys.argv):
-        key_length = int(sys.argv[i+1])
+def main():
+    """
+    Command line interface (see lab2_manual.txt).
+    """
+    # zmienne globalne
+    input_file = None
+    output_file = None
+    key_file = None
+    mode = None
+    key_length = 26
+    max_key_length = None
+    count = None
+    binary = False
+    generate_key = False
+    generate_perm = False
+    easy_mode = False
+    use_cache = False
+    stream = False
+    jobs = None
+    cascade = None
+    manifest = None
+
+    # odczytywanie argumentów
+    i = 0
+    while i < len(sys.argv):
+        if sys.argv[i] in ('-f', '--file') and i + 1 < len(sys.argv):
+            input_file = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] in ('-o', '--output') and i + 1 < len(sys.argv):
+            output_file = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] in ('-k', '--key_file') and i + 1 < len(sys.argv):
+            key_file = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] in ('-m', '--mode') and i + 1 < len(sys.argv):
+            mode = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] in ('-l', '--key_length') and i + 1 < len(sys.argv):
+            # długość albo zakres długości <min>-<max>
+            lengths = sys.argv[i+1].split('-')
+            key_length = int(lengths[0])
+            max_key_length = int(lengths[-1])
+            i += 1
+        if sys.argv[i] == '--count' and i + 1 < len(sys.argv):
+            count = int(sys.argv[i+1])
+            i += 1
+        if sys.argv[i] == '--binary':
+            binary = True
+        if sys.argv[i] == '--keygen':
+            generate_key = True
+        if sys.argv[i] == '--permgen':
+            generate_perm = True
+        if sys.argv[i] == '--cache':
+            use_cache = True
+        if sys.argv[i] == '--stream':
+            stream = True
+        if sys.argv[i] in ('-j', '--jobs') and i + 1 < len(sys.argv):
+            jobs = int(sys.argv[i+1])
+            i += 1
+        if sys.argv[i] == '--cascade' and i + 1 < len(sys.argv):
+            cascade = sys.argv[i+1]
+            i += 1
+        if sys.argv[i] == '--manifest' and i + 1 < len(sys.argv):
+            manifest = sys.argv[i+1]
+            i += 1
         i += 1
-    if sys.argv[i] == '--keygen':
-        generate_key = True
-    if sys.argv[i] == '--permgen':
-        generate_perm = True
-    i += 1
-
-if len(sys.argv) < 2:
-    print('Użycie:')
-    print('./lab2.py -f <plik wejściowy> -o <plik wyjściowy> --mode <tryb (de)szyfrowania> [--key_file <plik z kluczem>]')
-    print('./lab2.py --easy_mode')
-    print('Wpisz ./lab2.py -h aby uzyskać więcej informacji')
-    sys.exit()
-
-elif sys.argv[1] in ('-h', '--help'):
-    try:
-        print(io.open('lab2_manual.txt', mode='r', encoding='utf8') .read())
-    except:
-        print('Brak pliku z manualem')
-    sys.exit()
-
-elif sys.argv[1] == '--easy_mode':
-    easy_mode = True
 
-# generowanie kluczy
-if generate_key:
-    keygen(output_file, key_length)
-    sys.exit()
+    if len(sys.argv) < 2:
+        print('Użycie:')
+        print('./lab2.py -f <plik wejściowy> -o <plik wyjściowy> --mode <tryb (de)szyfrowania> [--key_file <plik z kluczem>]')
+        print('./lab2.py --easy_mode')
+        print('Wpisz ./lab2.py -h aby uzyskać więcej informacji')
+        sys.exit()
 
-if generate_perm:
-    permgen(output_file)
-    sys.exit()
+    elif sys.argv[1] in ('-h', '--help'):
+        try:
+            print(io.open('lab2_manual.txt', mode='r', encoding='utf8') .read())
+        except:
+            print('Brak pliku z manualem')
+        sys.exit()
 
-# główna część programu
+    elif sys.argv[1] == '--easy_mode':
+        easy_mode = True
 
-# wczytywanie pliku
-input_file_loaded = False
-easy_mode_b = easy_mode
-while not input_file_loaded:
-    try:
-        if easy_mode and easy_mode_b:
-            raise Exception
-        print(f'Otwieranie pliku {input_file}... ', end='')
-        plaintext = open_file(input_file)
-        print('gotowe')
-        input_file_loaded = True
-    except:
-        if not easy_mode_b:
-            print('wystąpił błąd')
-        else:
-            print()
-        if input_file is not None and '.' not in input_file:
-            input_file += '.txt'
-            continue
-        easy_mode_b = False
-        print('Podaj nazwę pliku wejściowego (exit aby wyjść)')
-        input_file = input()
-        if 'exit' == input_file.lower():
-            sys.exit()
-
-# szyfrowanie
-print(f'Szyfrowanie... ')
-
-mode_selected = False
-easy_mode_b = easy_mode
-while not mode_selected:
-    try:
-        if easy_mode and easy_mode_b:
-            raise Exception
-        if mode not in available_mode:
-            raise ValueError
-        mode_selected = True
-    except:
-        if not easy_mode_b:
-            print('Błąd. Wybrany tryb nie jest dostępny')
-            print(f'Wybrany tryb: {mode}.')
+    # generowanie wielu kluczy naraz
+    if count is not None and (generate_key or generate_perm):
+        if generate_key:
+            keys.write_keys(output_file, count, key_length, max_key_length, binary)
         else:
-            print()
-        easy_mode_b = False
-        print(f'Dostępne tryby: {available_mode}')
-        print('Wybierz poprawny tryb (exit aby wyjść)')
-        mode = input()
-        if 'exit' == mode.lower():
-            sys.exit()
-
-# w razie potrzeby wcztanie klucza
-key = None
-if mode in key_required:
-    key_file_loaded = False
+            keys.write_permutations(output_file, count, binary)
+        sys.exit()
+
+    # generowanie kluczy
+    if generate_key:
+        keygen(output_file, key_length)
+        sys.exit()
+
+    if generate_perm:
+        permgen(output_file)
+        sys.exit()
+
+    # tryb strumieniowy (bez pytań, "-" oznacza stdin/stdout, komunikaty na stderr)
+    if stream:
+        try:
+            if mode not in available_mode:
+                raise ValueError(f'niedostępny tryb {mode}')
+            key = None
+            if mode in key_required:
+                key = open_file(key_file)
+                if 'permutation' in mode and not is_valid_permutation(key):
+                    raise ValueError('błędna permutacja')
+            fin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf8') if input_file in (None, '-') else\
+                  io.open(input_file, mode='r', encoding='utf8')
+            fout = sys.stdout if output_file in (None, '-') else open(output_file, 'w')
+            with fin, fout:
+                stream_cipher(fin, fout, mode, key)
+        except Exception as e:
+            print(f'Wystąpił błąd: {e}', file=sys.stderr)
+            sys.exit(1)
+        sys.exit()
+
+    # kaskada szyfrów skompilowana do jednego przejścia (bez pytań)
+    if cascade is not None:
+        try:
+            steps = []
+            for step in cascade.split(','):
+                step_mode, _, step_key_file = step.partition(':')
+                if step_mode not in available_mode:
+                    raise ValueError(f'niedostępny tryb {step_mode}')
+                steps.append((step_mode, open_file(step_key_file) if step_key_file else None))
+            cipher = compile_cascade(steps)
+            print(f'Kaskada {len(steps)} kroków -> {type(cipher).__name__} '
+                  f'(okres {len(cipher.residue_table(1))})')
+            print(f'Szyfrowanie {input_file} -> {output_file}... ', end='')
+            write_to_file(cipher.encrypt(clean_file(input_file, False, True, True)), output_file)
+            print('gotowe')
+        except Exception as e:
+            print(f'Wystąpił błąd: {e}')
+            sys.exit(1)
+        sys.exit()
+
+    # wiele plików i kluczy w jednym uruchomieniu (bez pytań)
+    if manifest is not None:
+        try:
+            manifest_jobs = read_manifest(manifest)
+        except Exception as e:
+            print(f'Wystąpił błąd: {e}')
+            sys.exit(1)
+        failed = 0
+        time_0 = perf_counter()
+        for job, error, seconds in run_manifest(manifest_jobs, jobs):
+            status = 'ok' if error is None else f'błąd: {error}'
+            print(f'[{status}] {job["input"]} -> {job["output"]} ({job["mode"]}) {seconds:.3f} s')
+            failed += error is not None
+        print(f'Zadania: {len(manifest_jobs)}, poprawne: {len(manifest_jobs) - failed}, '
+              f'błędne: {failed}, czas: {perf_counter() - time_0:.2f} s')
+        sys.exit(1 if failed else 0)
+
+    # tryb równoległy dla szyfru Viganere (bez pytań)
+    if jobs is not None:
+        try:
+            if mode not in ('encrypt_viganere', 'decrypt_viganere'):
+                raise ValueError('tryb równoległy jest dostępny tylko dla szyfru Viganere')
+            key = open_file(key_file)
+            print(f'Szyfrowanie równoległe ({jobs} procesów) {input_file} -> {output_file}... ', end='')
+            parallel_viganere(input_file, output_file, key, mode == 'decrypt_viganere', jobs)
+            print('gotowe')
+        except Exception as e:
+            print(f'Wystąpił błąd: {e}')
+            sys.exit(1)
+        sys.exit()
+
+    # główna część programu
+
+    # wczytywanie pliku
+    input_file_loaded = False
     easy_mode_b = easy_mode
-    while not key_file_loaded:
+    while not input_file_loaded:
         try:
             if easy_mode and easy_mode_b:
                 raise Exception
-            print(f'Otwieranie pliku z kluczem {key_file}... ', end='')
-            key = open_file(key_file)
+            if use_cache:
+                print(f'Wczytywanie oczyszczonego pliku {input_file} (pamięć podręczna)... ', end='')
+                plaintext = cache.cached_clean(input_file, {'encoding': 'utf8', 'keep_spaces': False,
+                                                            'remove_numbers': True, 'lower': True}, clean)
+            else:
+                print(f'Otwieranie i czyszczenie pliku {input_file}... ', end='')
+                plaintext = clean_file(input_file, False, True, True)
+            print('gotowe')
+            input_file_loaded = True
+        except:
+            if not easy_mode_b:
+                print('wystąpił błąd')
+            else:
+                print()
+            if input_file is not None and '.' not in input_file:
+                input_file += '.txt'
+                continue
+            easy_mode_b = False
+            print('Podaj nazwę pliku wejściowego (exit aby wyjść)')
+            input_file = input()
+            if 'exit' == input_file.lower():
+                sys.exit()
 
-            # sprawdzenie poprawności permutacji
-            if 'permutation' in mode:
-                if len(key) != 26 or\
-                   ''.join(sorted(list(key))) != ascii_lowercase:
-                    print('błędna permutacja... ', end='')
+    # szyfrowanie
+    print(f'Szyfrowanie... ')
+
+    mode_selected = False
+    easy_mode_b = easy_mode
+    while not mode_selected:
+        try:
+            if easy_mode and easy_mode_b:
+                raise Exception
+            if mode not in available_mode:
+                raise ValueError
+            mode_selected = True
+        except:
+            if not easy_mode_b:
+                print('Błąd. Wybrany tryb nie jest dostępny')
+                print(f'Wybrany tryb: {mode}.')
+            else:
+                print()
+            easy_mode_b = False
+            print(f'Dostępne tryby: {available_mode}')
+            print('Wybierz poprawny tryb (exit aby wyjść)')
+            mode = input()
+            if 'exit' == mode.lower():
+                sys.exit()
+
+    # w razie potrzeby wcztanie klucza
+    key = None
+    cipher = None
+    if mode in key_required:
+        key_file_loaded = False
+        easy_mode_b = easy_mode
+        while not key_file_loaded:
+            try:
+                if easy_mode and easy_mode_b:
                     raise Exception
+                print(f'Otwieranie pliku z kluczem {key_file}... ', end='')
+                key = open_file(key_file)
+
+                # sprawdzenie poprawności klucza (raz, przy budowaniu szyfru)
+                try:
+                    cipher = get_cipher(mode, key)
+                except ValueError:
+                    print('błędna permutacja... ' if 'permutation' in mode else 'błędny klucz... ', end='')
+                    raise
+                print('gotowe')
+                key_file_loaded = True
+            except:
+                if not easy_mode_b:
+                    print('wystąpił błąd')
+                else:
+                    print()
+                if key_file is not None and '.' not in key_file:
+                    key_file += '.txt'
+                    continue
+                easy_mode_b = False
+                print('Podaj nazwę pliku z kluczem (exit aby wyjść)')
+                key_file = input()
+                if 'exit' == key_file.lower():
+                    sys.exit()
+
+    # właściwe szyfrowanie
+    print('Właściwe szyfrowanie... ', end='')
+    if cipher is None:
+        cipher = get_cipher(mode)
+    ciphertext = cipher(plaintext)
+    print('gotowe')
+
+    print('Zaszyfrowano')
+
+    # zapis do pliku
+    output_file_opened = False
+    easy_mode_b = easy_mode
+    while not output_file_opened:
+        try:
+            if easy_mode and easy_mode_b:
+                raise Exception
+            if output_file is not None and '.' not in output_file:
+                output_file += '.txt'
+            print(f'Zapis wyniku do pliku {output_file}... ', end='')
+            write_to_file(ciphertext, output_file)
             print('gotowe')
-            key_file_loaded = True
+            output_file_opened = True
         except:
             if not easy_mode_b:
                 print('wystąpił błąd')
             else:
                 print()
-            if key_file is not None and '.' not in key_file:
-                key_file += '.txt'
-                continue
             easy_mode_b = False
-            print('Podaj nazwę pliku z kluczem (exit aby wyjść)')
-            key_file = input()
-            if 'exit' == key_file.lower():
+            print('Podaj nazwę pliku wyjściowego (exit aby wyjść)')
+            output_file = input()
+            if 'exit' == output_file.lower():
                 sys.exit()
 
-# oczyszczenie tekstu
-print('Usuwanie białych znaków... ', end='')
-plaintext = clean_text(plaintext, False)
-print('gotowe')
-print('Usuwanie cyfr... ', end='')
-plaintext = clean_num(plaintext)
-print('gotowe')
-print('Zamiana znaków diakrytycznych... ', end='')
-plaintext = clean_acc(plaintext, True)
-print('gotowe')
-
-# właściwe szyfrowanie
-print('Właściwe szyfrowanie... ', end='')
-ciphertext = locals()[mode](plaintext, key)
-print('gotowe')
-
-print('Zaszyfrowano')
-
-# zapis do pliku
-output_file_opened = False
-easy_mode_b = easy_mode
-while not output_file_opened:
-    try:
-        if easy_mode and easy_mode_b:
-            raise Exception
-        if output_file is not None and '.' not in output_file:
-            output_file += '.txt'
-        print(f'Zapis wyniku do pliku {output_file}... ', end='')
-        write_to_file(ciphertext, output_file)
-        print('gotowe')
-        output_file_opened = True
-    except:
-        if not easy_mode_b:
-            print('wystąpił błąd')
-        else:
-            print()
-        easy_mode_b = False
-        print('Podaj nazwę pliku wyjściowego (exit aby wyjść)')
-        output_file = input()
-        if 'exit' == output_file.lower():
-            sys.exit()
+if __name__ == '__main__':
+    main()
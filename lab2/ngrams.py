@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import io
+import numpy as np
+
+import lab2
+
+A = ord('a')
+
+# najdłuższe liczone n-gramy
+MAX_N = 4
+
+# rozmiar fragmentu (w znakach) czytanego z korpusu
+CHUNK_SIZE = 1 << 20
+
+def ngram_path(directory, n):
+    """
+    Returns name of a file with n-gram counts.
+    Parameters:
+        directory (string) - index directory
+        n (int) - n-gram length
+    Returns:
+        file name (string)
+    """
+    return os.path.join(directory, f'{n}grams.npy')
+
+def ngram_codes(res, n):
+    """
+    Numbers all n-grams of text (base 26, first letter most significant).
+    Parameters:
+        res (numpy.ndarray) - letter numbers 0 - 25
+        n (int) - n-gram length
+    Returns:
+        n-gram numbers 0 - 26^n-1 (numpy.ndarray of int64)
+    """
+    codes = np.zeros(max(len(res) - n + 1, 0), np.int64)
+    for i in range(n):
+        codes = codes*26 + res[i:len(res)-n+1+i]
+
+    return codes
+
+def count_ngrams(chunks, max_n=MAX_N):
+    """
+    Counts n-grams of letters a-z in consecutive chunks of text. Last
+    max_n - 1 letters of every chunk are carried to the next one, so
+    n-grams crossing chunk borders are counted once.
+    Parameters:
+        chunks (iterable of strings) - cleaned text
+        max_n (int) - longest counted n-grams
+    Returns:
+        list of counts of 1- to max_n-grams (numpy.ndarray of int64, 26^n each)
+    """
+    counts = [np.zeros(26**n, np.int64) for n in range(1, max_n + 1)]
+    tail = np.zeros(0, np.int64)
+    for chunk in chunks:
+        codes = np.frombuffer(chunk.encode('ascii', 'ignore'), np.uint8)
+        res = np.concatenate((tail, codes[(codes >= A) & (codes < A + 26)].astype(np.int64) - A))
+        for n in range(1, max_n + 1):
+            # tylko n-gramy kończące się w nowym fragmencie
+            start = max(len(tail) - n + 1, 0)
+            counts[n - 1] += np.bincount(ngram_codes(res[start:], n), minlength=26**n)
+        tail = res[max(len(res) - max_n + 1, 0):] if max_n > 1 else res[:0]
+
+    return counts
+
+def count_files(filenames, max_n=MAX_N, chunk_size=CHUNK_SIZE):
+    """
+    Counts n-grams of corpus files, reading and cleaning them in chunks
+    (the same way lab2 cleans text before encryption).
+    Parameters:
+        filenames (list of strings) - corpus files
+        max_n (int) - longest counted n-grams
+        chunk_size (int) - number of characters read at once
+    Returns:
+        list of counts of 1- to max_n-grams (numpy.ndarray of int64)
+    Raises:
+        ValueError: chunk_size is not positive
+    """
+    if chunk_size <= 0:
+        raise ValueError
+
+    def chunks():
+        for filename in filenames:
+            with io.open(filename, mode='r', encoding='utf8') as f:
+                for chunk in iter(lambda: f.read(chunk_size), ''):
+                    yield lab2.clean(chunk)
+
+    return count_ngrams(chunks(), max_n)
+
+def save(counts, directory):
+    """
+    Saves n-gram counts as .npy files (uint32, or uint64 if needed).
+    Parameters:
+        counts (list of numpy.ndarray) - counts of 1- to n-grams
+        directory (string) - index directory (created if missing)
+    """
+    os.makedirs(directory, exist_ok=True)
+    for n, count in enumerate(counts, 1):
+        dtype = np.uint32 if count.max(initial=0) < 1 << 32 else np.uint64
+        np.save(ngram_path(directory, n), count.astype(dtype))
+
+def load(directory, n, mmap_mode='r'):
+    """
+    Loads n-gram counts from index, memory-mapped by default.
+    Parameters:
+        directory (string) - index directory
+        n (int) - n-gram length
+        mmap_mode (string) - numpy.load memory mapping mode (None reads the file)
+    Returns:
+        counts indexed by n-gram number (numpy.ndarray)
+    """
+    return np.load(ngram_path(directory, n), mmap_mode=mmap_mode)
+
+def probabilities(counts):
+    """
+    Converts n-gram counts to probabilities.
+    Parameters:
+        counts (numpy.ndarray) - n-gram counts
+    Returns:
+        probabilities (numpy.ndarray of float64)
+    Raises:
+        ValueError: all counts are zero
+    """
+    total = counts.sum(dtype=np.float64)
+    if total == 0:
+        raise ValueError
+
+    return counts/total
+
+def log_probabilities(counts, floor=0.01):
+    """
+    Converts n-gram counts to log10 probabilities. N-grams that did not
+    occur get probability of floor occurrences.
+    Parameters:
+        counts (numpy.ndarray) - n-gram counts
+        floor (float) - count assumed for missing n-grams
+    Returns:
+        log10 probabilities (numpy.ndarray of float32)
+    Raises:
+        ValueError: all counts are zero
+    """
+    total = counts.sum(dtype=np.float64)
+    if total == 0:
+        raise ValueError
+
+    return np.log10(np.maximum(counts, floor)/total).astype(np.float32)
+
+def top(counts, n, k=10):
+    """
+    Returns the most frequent n-grams.
+    Parameters:
+        counts (numpy.ndarray) - n-gram counts
+        n (int) - n-gram length
+        k (int) - number of n-grams
+    Returns:
+        list of (n-gram (string), count (int))
+    """
+    result = []
+    for code in np.argsort(-counts.astype(np.int64), kind='stable')[:k]:
+        letters = ''.join(chr(A + int(code)//26**(n - 1 - i) % 26) for i in range(n))
+        result.append((letters, int(counts[code])))
+
+    return result
+
+if __name__ == '__main__':
+    directory = None
+    show = False
+    filenames = []
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] in ('-o', '--output') and i + 1 < len(sys.argv):
+            directory = sys.argv[i+1]
+            i += 1
+        elif sys.argv[i] == '--show' and i + 1 < len(sys.argv):
+            directory = sys.argv[i+1]
+            show = True
+            i += 1
+        else:
+            filenames.append(sys.argv[i])
+        i += 1
+
+    if directory is None or (not show and not filenames):
+        print('Użycie:')
+        print('./ngrams.py -o <katalog indeksu> <korpus> [<korpus> ...]')
+        print('./ngrams.py --show <katalog indeksu>')
+        sys.exit()
+
+    try:
+        if not show:
+            print(f'Liczenie n-gramów ({len(filenames)} plików)... ', end='', flush=True)
+            save(count_files(filenames), directory)
+            print('gotowe')
+
+        for n in range(1, MAX_N + 1):
+            counts = load(directory, n)
+            print(f'{n}-gramy: {int(counts.sum(dtype=np.int64))}, najczęstsze: ' +
+                  ' '.join(f'{letters}:{count}' for letters, count in top(counts, n, 8)))
+    except Exception as e:
+        print(f'Wystąpił błąd: {e}')
+        sys.exit(1)
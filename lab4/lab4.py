@@ -2,10 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 from time import perf_counter
 from random import choice, randint
 from msvcrt import getch
-from unidecode import unidecode
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.normalize import transliterate
 
 # config
 CIPHER_WIDTH = 4
@@ -297,7 +300,7 @@ def encrypt():
                 pass
         print('    Podaj właściwą nazwę pliku')
     
-    plaintext = unidecode(plaintext)
+    plaintext = transliterate(plaintext)
 
     print('  Wczytana wiadomość:', end='')
     for i in range(min(128, len(plaintext))):
@@ -1,5 +1,5 @@
 import os
-from unidecode import unidecode as ud
+import sys
 from random import randint, seed
 import io
 from time import perf_counter
@@ -9,6 +9,9 @@ else:
     from getch import getch
 import traceback
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.normalize import transliterate
+
 HASH_BYTES = 4
 BLOCK_KEY = '1d5ee748'
 
@@ -75,7 +78,7 @@ def hash_t(text):
         hash (str)             
     """
     # zamiana znaków specjalnych na ascii
-    text = ud(text)
+    text = transliterate(text)
 
     # 4 bajty - 8 znaków 0-9a-f
     n = 8*HASH_BYTES
@@ -128,7 +131,7 @@ def block_t(text, key):
         hash (str)             
     """
     # zamiana znaków specjalnych na ascii
-    text = ud(text)
+    text = transliterate(text)
 
     text_bits = []
 
@@ -4,10 +4,11 @@ import re
 import sys
 import os
 import io
-from unidecode import unidecode as ud
 from msvcrt import getch
-from random import choice
-from string import ascii_lowercase
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common import keys, vigenere
+from common.normalize import transliterate
 
 def encrypt_viganere(plaintext, key):
     """
@@ -21,14 +22,9 @@ def encrypt_viganere(plaintext, key):
         TypeError: plaintext is not a string
     """
     if type(plaintext) != str:
-        return TypeError
-
-    ciphertext = ''
-
-    for i in range(len(plaintext)):
-        ciphertext += chr(((ord(plaintext[i]) - ord('a')) + (ord(key[i%len(key)]) - ord('a')))%26 + ord('a'))
+        raise TypeError
 
-    return ciphertext
+    return vigenere.encrypt(plaintext, key)
 
 def decrypt_viganere(plaintext, key):
     """
@@ -44,12 +40,7 @@ def decrypt_viganere(plaintext, key):
     if type(plaintext) != str:
         raise TypeError
 
-    ciphertext = ''
-
-    for i in range(len(plaintext)):
-        ciphertext += chr(((ord(plaintext[i]) - ord('a')) - (ord(key[i%len(key)]) - ord('a')))%26 + ord('a'))
-
-    return ciphertext
+    return vigenere.decrypt(plaintext, key)
 
 def keygen(length):
     """
@@ -63,11 +54,7 @@ def keygen(length):
     if length <= 0:
         raise ValueError
 
-    key = ''
-    for _ in range(length):
-        key += choice(ascii_lowercase)
-    
-    return key
+    return keys.random_key(length)
 
 def encrypt():
     """
@@ -101,9 +88,7 @@ def encrypt():
         print('    Podaj właściwą nazwę pliku')
     
     in_filename = filename
-    plaintext = ud(plaintext)
-    for c in ' \r\n\t':
-        plaintext = plaintext.replace(c, '')
+    plaintext = transliterate(plaintext, ' \r\n\t')
 
     print('  Wczytana wiadomość:', end='')
     for i in range(min(128, len(plaintext))):
@@ -208,7 +193,7 @@ def decrypt():
         print('    Podaj właściwą nazwę pliku')
     
     in_filename = filename
-    ciphertext = ud(ciphertext)
+    ciphertext = transliterate(ciphertext)
 
     print('  Wczytana wiadomość:', end='')
     for i in range(min(128, len(ciphertext))):